@@ -12,6 +12,7 @@ Crypto Data API 模块
     - get_okx_liquidation: 获取爆仓订单数据
     - get_top_trader_long_short_position_ratio: 获取精英交易员合约多空持仓仓位比
     - get_option_open_interest_volume_ratio: 获取看涨/看跌期权合约持仓总量比/交易总量比
+    - get_okx_market_snapshot: 并发获取单个品种的 K线/资金费率/持仓量/多空比/爆仓数据
 
 使用示例:
     from crypto_data import get_okx_candles, get_okx_funding_rate
@@ -20,13 +21,31 @@ Crypto Data API 模块
     funding_df = get_okx_funding_rate("BTC-USDT-SWAP", limit=50)
 """
 
+import functools
+import hashlib
+import inspect
+import json
+import math
+import os
+import threading
+import warnings
+import numpy as np
 import requests
 import pandas as pd
 import time
-from typing import Optional
+from concurrent.futures import ThreadPoolExecutor
+from datetime import date, datetime, timezone
+from operator import itemgetter
+from pathlib import Path
+from typing import Callable, Dict, Optional, Tuple, Union
 from requests.adapters import HTTPAdapter
 from urllib3.util.retry import Retry
 
+try:
+    import orjson
+except ImportError:  # 未安装 orjson 时退回 requests 自带的标准库 json 解析
+    orjson = None
+
 # ==============================================================================
 # 配置常量
 # ==============================================================================
@@ -37,12 +56,71 @@ DEFAULT_PROXY = {
 }
 
 DEFAULT_HEADERS = {
-    "User-Agent": "Mozilla/5.0",
-    "Connection": "close"
+    "User-Agent": "Mozilla/5.0"
 }
 
 DEFAULT_TIMEOUT = 10
 
+# 并发请求线程池：网络 I/O 为主，同一函数内互不依赖的请求并行发出，
+# 总耗时从 N×RTT 降到约 1×RTT (同时控制对 OKX 的并发量)
+_EXECUTOR = ThreadPoolExecutor(max_workers=8, thread_name_prefix="okx")
+
+# 分页并发上限：OKX rubik 接口限速 20 次/2s，单个函数最多同时 5 个请求
+_PAGE_SEMAPHORE = threading.BoundedSemaphore(5)
+
+# 时间粒度 -> 毫秒，用于按时间窗口预先切分分页
+_PERIOD_MS = {
+    '5m': 5 * 60_000,
+    '15m': 15 * 60_000,
+    '30m': 30 * 60_000,
+    '1H': 3_600_000,
+    '2H': 2 * 3_600_000,
+    '4H': 4 * 3_600_000,
+    '1D': 86_400_000,
+}
+
+# 本地磁盘缓存：相同参数的请求在 TTL 内直接读取本地文件，不再访问网络
+# 设置环境变量 CRYPTO_CACHE=0 可关闭，CRYPTO_CACHE_DIR 可修改缓存目录
+CACHE_DIR = Path(os.getenv("CRYPTO_CACHE_DIR", str(Path.home() / ".crypto_cache")))
+CACHE_ENABLED = os.getenv("CRYPTO_CACHE", "1") != "0"
+
+# 按 K线周期 / 时间粒度划分的缓存有效期 (秒)，周期越长数据变化越慢
+_PERIOD_TTL = {
+    '1m': 30,
+    '5m': 60,
+    '15m': 120,
+    '30m': 180,
+    '1H': 300,
+    '2H': 600,
+    '4H': 600,
+    '8H': 1800,
+    '1D': 1800,
+    '1W': 3600,
+}
+
+# 常见请求异常 -> 提示信息 (按顺序匹配，isinstance 兼容子类异常)
+_REQUEST_ERROR_MESSAGES = {
+    requests.exceptions.ProxyError: "错误：代理连接失败。请检查：\n1. 你的梯子是否开启？\n2. 端口号是否正确？",
+    requests.exceptions.ReadTimeout: "错误：读取超时。可能是网络拥堵或被服务器拦截，请尝试更换 VPN 节点。",
+    requests.exceptions.SSLError: "错误：SSL 握手失败。请检查是否开启了'系统代理'但未配置Python代理。",
+}
+
+# 恐惧贪婪指数输出列
+_FEAR_GREED_COLUMNS = ['date', 'value', 'value_classification']
+
+# 爆仓明细中需要的字段
+_LIQUIDATION_FIELDS = itemgetter('ts', 'side', 'bkPx', 'sz')
+
+# 取值为少量枚举的列，转为 category 类型节省内存
+_CATEGORY_COLUMNS = ('side', 'type', 'value_classification')
+
+# 标记价格短期缓存：inst_id -> (获取时间, 标记价格)，同一轮对话内重复调用时免去一次请求
+_MARK_PRICE_TTL = 5
+_MARK_PRICE_CACHE: Dict[str, Tuple[float, float]] = {}
+
+# 恐惧贪婪指数为日频数据：进程内按 days 缓存，记录获取时的 UTC 日期，跨日自动失效
+_FG_CACHE: Dict[int, Tuple[date, pd.DataFrame]] = {}
+
 
 # ==============================================================================
 # 辅助函数
@@ -50,7 +128,7 @@ DEFAULT_TIMEOUT = 10
 
 def _create_session(max_retries: int = 3) -> requests.Session:
     """
-    创建一个带有重试策略的 requests Session。
+    创建一个带有重试策略和连接池的 requests Session。
 
     Args:
         max_retries: 最大重试次数
@@ -64,28 +142,238 @@ def _create_session(max_retries: int = 3) -> requests.Session:
         backoff_factor=1,
         status_forcelist=[429, 500, 502, 503, 504]
     )
-    adapter = HTTPAdapter(max_retries=retry_strategy)
+    adapter = HTTPAdapter(
+        pool_connections=10,
+        pool_maxsize=20,
+        max_retries=retry_strategy
+    )
     session.mount("https://", adapter)
     session.mount("http://", adapter)
+    session.headers.update(DEFAULT_HEADERS)
     return session
 
 
+# 模块级共享 Session：复用 TCP/TLS 连接，避免每次请求重新握手
+_SESSION = _create_session()
+
+
+def _parse_json(response: requests.Response) -> dict:
+    """解析响应体 JSON：优先使用 orjson (C 实现，直接解析 bytes)，否则退回 response.json()。"""
+    if orjson is not None:
+        return orjson.loads(response.content)
+    return response.json()
+
+
 def _handle_request_error(error: Exception) -> None:
     """统一处理请求异常并打印错误信息。"""
-    if isinstance(error, requests.exceptions.ProxyError):
-        print("错误：代理连接失败。请检查：\n1. 你的梯子是否开启？\n2. 端口号是否正确？")
-    elif isinstance(error, requests.exceptions.ReadTimeout):
-        print("错误：读取超时。可能是网络拥堵或被服务器拦截，请尝试更换 VPN 节点。")
-    elif isinstance(error, requests.exceptions.SSLError):
-        print("错误：SSL 握手失败。请检查是否开启了'系统代理'但未配置Python代理。")
-    else:
-        print(f"发生错误: {error}")
+    message = next(
+        (msg for error_type, msg in _REQUEST_ERROR_MESSAGES.items() if isinstance(error, error_type)),
+        f"发生错误: {error}"
+    )
+    print(message)
+
+
+def _period_ttl(name: str) -> Callable[[Dict], int]:
+    """返回按参数 name (K线周期/时间粒度) 查表计算 TTL 的函数，未知周期默认 60 秒。"""
+    return lambda params: _PERIOD_TTL.get(params[name], 60)
+
+
+def _cache_path(func_name: str, key: str) -> Path:
+    """缓存文件路径: {CACHE_DIR}/{函数名}/{参数哈希}.parquet"""
+    return CACHE_DIR / func_name / f"{key}.parquet"
+
+
+def _cache_get(path: Path, ttl: int) -> Optional[pd.DataFrame]:
+    """读取未过期的缓存文件，不存在、已过期或损坏时返回 None。"""
+    try:
+        if time.time() - path.stat().st_mtime > ttl:
+            return None
+        return pd.read_parquet(path, engine='pyarrow')
+    except Exception:
+        return None
+
+
+def _cache_put(path: Path, df: pd.DataFrame) -> None:
+    """
+    写入缓存文件 (先写临时文件再原子替换，避免并发读到半个文件)。
+
+    使用 Parquet 而非 pickle：缓存目录中的文件被篡改时，读取 pickle 会执行任意代码。
+    写入失败时删除临时文件，缓存只是加速手段，不影响调用方。
+    """
+    tmp_path = path.with_suffix(f".{os.getpid()}.{threading.get_ident()}.tmp")
+    try:
+        path.parent.mkdir(parents=True, exist_ok=True)
+        df.to_parquet(tmp_path, engine='pyarrow')
+        os.replace(tmp_path, path)
+    except Exception:
+        try:
+            tmp_path.unlink(missing_ok=True)
+        except OSError:
+            pass
+
+
+def _cached(ttl: Union[int, Callable[[Dict], int]]):
+    """
+    为数据获取函数添加基于 TTL 的本地磁盘缓存。
+
+    缓存键为函数名 + 全部参数 (不含 use_proxy) 的 SHA1，请求失败 (返回 None) 不写入缓存。
+    被装饰函数的 invalidate(*args, **kwargs) 可删除对应参数的缓存文件。
+
+    Args:
+        ttl: 缓存有效期 (秒)，或根据参数字典计算有效期的函数
+    """
+    def decorator(func):
+        signature = inspect.signature(func)
+
+        def locate(args, kwargs) -> Tuple[Dict, Path]:
+            bound = signature.bind(*args, **kwargs)
+            bound.apply_defaults()
+            params = {k: v for k, v in bound.arguments.items() if k != 'use_proxy'}
+            key = hashlib.sha1(
+                json.dumps({'fn': func.__name__, **params}, sort_keys=True, default=str).encode()
+            ).hexdigest()
+            return params, _cache_path(func.__name__, key)
+
+        @functools.wraps(func)
+        def wrapper(*args, **kwargs):
+            if not CACHE_ENABLED:
+                return func(*args, **kwargs)
+
+            params, path = locate(args, kwargs)
+            df = _cache_get(path, ttl(params) if callable(ttl) else ttl)
+            if df is not None:
+                return df
+
+            df = func(*args, **kwargs)
+            if df is not None:
+                _cache_put(path, df)
+            return df
+
+        def invalidate(*args, **kwargs) -> None:
+            try:
+                locate(args, kwargs)[1].unlink()
+            except OSError:
+                pass
+
+        # 暴露有效期，供上层 (如 MCP 服务的响应缓存) 沿用同一 TTL
+        wrapper.cache_ttl = ttl
+        wrapper.invalidate = invalidate
+        return wrapper
+    return decorator
+
+
+def _optimize_dtypes(df: pd.DataFrame) -> pd.DataFrame:
+    """
+    压缩 DataFrame 的整数与枚举列类型，减少内存占用。
+
+    - 浮点列 (价格/成交量/费率等): 保持 float64。按数据决定是否降为 float32 会让同一列的
+      类型随每次返回而变，float32 上的求和/乘积也会损失精度
+    - 整数列: 取值范围允许时降级为 int32
+    - side / type / value_classification: 转为 category
+
+    Args:
+        df: 待处理的 DataFrame (原地修改)
+
+    Returns:
+        处理后的 DataFrame
+    """
+    for col in df.columns:
+        values = df[col]
+        if col in _CATEGORY_COLUMNS:
+            df[col] = values.astype('category')
+        elif pd.api.types.is_integer_dtype(values) and len(values):
+            info = np.iinfo(np.int32)
+            if info.min <= values.min() and values.max() <= info.max:
+                df[col] = values.astype(np.int32)
+    return df
+
+
+def _get_mark_price(inst_id: str, proxies: Optional[Dict], timeout: float) -> float:
+    """获取永续合约当前标记价格，5 秒内重复调用直接返回缓存值。"""
+    cached = _MARK_PRICE_CACHE.get(inst_id)
+    if cached is not None and time.monotonic() - cached[0] < _MARK_PRICE_TTL:
+        return cached[1]
+
+    response = _SESSION.get(
+        "https://www.okx.com/api/v5/public/mark-price",
+        params={"instId": inst_id},
+        proxies=proxies,
+        timeout=timeout
+    )
+    mark_price = float(_parse_json(response)['data'][0]['markPx'])
+    _MARK_PRICE_CACHE[inst_id] = (time.monotonic(), mark_price)
+    return mark_price
+
+
+def _ts_ms_to_datetime(ts) -> np.ndarray:
+    """
+    将 OKX 毫秒时间戳 (字符串或整数序列) 转为 datetime64[ms] 数组。
+
+    字符串一次解析为 int64 后直接按 datetime64[ms] 视图解释，
+    省去 pd.to_numeric 的中间 Series 和 pd.to_datetime 的第二遍转换。
+    """
+    return np.asarray(ts, dtype=np.int64).view('datetime64[ms]')
+
+
+def _sort_by_datetime(df: pd.DataFrame, ascending: bool = True) -> pd.DataFrame:
+    """
+    按 datetime 列排序并重置索引。
+
+    OKX 接口返回的数据本身按时间有序 (通常为降序)：已是目标顺序时直接返回，
+    顺序相反时整体翻转，只有乱序时才真正排序，避免 sort_values 构建排序索引并复制每一列。
+    """
+    dt = df['datetime']
+    if (dt.is_monotonic_increasing if ascending else dt.is_monotonic_decreasing):
+        return df
+    if (dt.is_monotonic_decreasing if ascending else dt.is_monotonic_increasing):
+        return df.iloc[::-1].reset_index(drop=True)
+
+    order = np.argsort(dt.to_numpy(), kind='stable')
+    if not ascending:
+        order = order[::-1]
+    return df.iloc[order].reset_index(drop=True)
+
+
+def _memoize_daily(func):
+    """
+    按 UTC 日期对 get_fear_greed_index 做进程内缓存。
+
+    同一 UTC 日内相同 days 的重复调用直接返回缓存结果 (返回副本，调用方可安全修改)，
+    连本地磁盘缓存的读取也一并省去。
+
+    磁盘缓存 (12 小时) 跨过 UTC 零点时可能仍是前一天的数据：最新一行不是当天时删除该
+    磁盘缓存并重新请求；仍不是当天 (指数尚未发布) 则照常返回，但不做进程内缓存。
+    """
+    @functools.wraps(func)
+    def wrapper(days: int = 7, use_proxy: bool = False) -> Optional[pd.DataFrame]:
+        today = datetime.now(timezone.utc).date()
+        cached = _FG_CACHE.get(days)
+        if cached is not None and cached[0] == today:
+            return cached[1].copy()
+
+        def is_current(df: pd.DataFrame) -> bool:
+            return len(df) > 0 and df['date'].max() == today.isoformat()
+
+        df = func(days=days, use_proxy=use_proxy)
+        if df is not None and not is_current(df) and CACHE_ENABLED:
+            func.invalidate(days=days)
+            fresh = func(days=days, use_proxy=use_proxy)
+            if fresh is not None:
+                df = fresh
+        if df is None:
+            return None
+        if is_current(df):
+            _FG_CACHE[days] = (today, df)
+        return df.copy()
+
+    return wrapper
 
 
 # ==============================================================================
 # 主要 API 函数
 # ==============================================================================
 
+@_cached(ttl=_period_ttl('bar'))
 def get_okx_candles(
     inst_id: str,
     bar: str = '1H',
@@ -125,40 +413,45 @@ def get_okx_candles(
 
     try:
         print(f"正在获取 {inst_id} K线数据 (周期: {bar})...")
-        response = requests.get(
+        response = _SESSION.get(
             url,
             params=params,
             proxies=proxies,
             timeout=DEFAULT_TIMEOUT
         )
         response.raise_for_status()
-        data = response.json()
+        data = _parse_json(response)
 
         if data['code'] != '0':
             print(f"API 报错: {data['msg']}")
             return None
 
-        candles = data['data']
-        df = pd.DataFrame(candles, columns=[
-            'ts', 'open', 'high', 'low', 'close', 'vol', 'volCcy', 'volCcyQuote', 'confirm'
-        ])
-
-        # 数据处理
-        df['datetime'] = pd.to_datetime(pd.to_numeric(df['ts']), unit='ms')
-        df = df[['datetime', 'open', 'high', 'low', 'close', 'vol']]
-
-        # 数值类型转换
-        for col in ['open', 'high', 'low', 'close', 'vol']:
-            df[col] = pd.to_numeric(df[col])
-
-        df = df.sort_values('datetime').reset_index(drop=True)
-        return df
+        # 一次性转为二维字符串数组，时间戳与 OHLCV 各做一次整体类型转换，
+        # 避免逐列 pd.to_numeric 和 object 类型中间列
+        # 原始列: ts, open, high, low, close, vol, volCcy, volCcyQuote, confirm
+        candles = np.array(data['data'], dtype=str)
+        if candles.ndim != 2:
+            candles = candles.reshape(0, 9)
+        # OKX 按时间降序返回：先在原始数组上翻转为升序 (视图，无复制)，构建后无需再排序
+        if len(candles) > 1 and int(candles[0, 0]) > int(candles[-1, 0]):
+            candles = candles[::-1]
+
+        # OHLCV 转为 (5, N) 行连续的 float64 块，DataFrame 直接以该块作为底层存储 (copy=False)，
+        # 每列在内存中连续且不再复制一遍
+        ohlcv = candles[:, 1:6].T.astype(np.float64, order='C')
+        df = pd.DataFrame(ohlcv.T, columns=['open', 'high', 'low', 'close', 'vol'], copy=False)
+        df.insert(0, 'datetime', _ts_ms_to_datetime(candles[:, 0]))
+
+        df = _sort_by_datetime(df)
+        return _optimize_dtypes(df)
 
     except Exception as e:
         _handle_request_error(e)
         return None
 
 
+@_memoize_daily
+@_cached(ttl=12 * 3600)
 def get_fear_greed_index(
     days: int = 7,
     use_proxy: bool = False
@@ -191,14 +484,14 @@ def get_fear_greed_index(
 
     try:
         print(f"正在获取恐惧贪婪指数 (最近 {days} 天)...")
-        response = requests.get(
+        response = _SESSION.get(
             url,
             params=params,
             proxies=proxies,
             timeout=DEFAULT_TIMEOUT
         )
         response.raise_for_status()
-        data = response.json()
+        data = _parse_json(response)
 
         # 检查 API 错误
         if data.get('metadata', {}).get('error'):
@@ -213,9 +506,9 @@ def get_fear_greed_index(
             df['date'] = df['timestamp'].dt.strftime('%Y-%m-%d')  # pyright: ignore[reportAttributeAccessIssue]
             # value 是字符串，需要转换
             df['value'] = pd.to_numeric(df['value'], errors='coerce')
-            # 只保留需要的列
-            df = df[['date', 'value', 'value_classification']]
-            return df
+            # 只保留需要的列 (固定 schema，字段缺失时直接报错而非静默丢列)
+            df = df[_FEAR_GREED_COLUMNS]
+            return _optimize_dtypes(df)
         else:
             print(f"API 返回数据为空或结构异常: {data}")
             return None
@@ -225,6 +518,7 @@ def get_fear_greed_index(
         return None
 
 
+@_cached(ttl=30 * 60)
 def get_okx_funding_rate(
     inst_id: str,
     limit: int = 100,
@@ -266,64 +560,64 @@ def get_okx_funding_rate(
     try:
         print(f"正在获取 {inst_id} 的资金费率数据...")
 
-        # 获取历史已结算费率
-        res_hist = requests.get(
+        # 历史已结算费率与当前预测费率互不依赖，并发请求
+        fut_hist = _EXECUTOR.submit(
+            _SESSION.get,
             url_history,
             params=params_history,
             proxies=proxies,
             timeout=DEFAULT_TIMEOUT
         )
+        fut_curr = _EXECUTOR.submit(
+            _SESSION.get,
+            url_current,
+            params=params_current,
+            proxies=proxies,
+            timeout=DEFAULT_TIMEOUT
+        )
+
+        # 获取历史已结算费率
+        res_hist = fut_hist.result()
         res_hist.raise_for_status()
-        data_hist = res_hist.json()
+        data_hist = _parse_json(res_hist)
 
         if data_hist['code'] != '0':
             print(f"历史数据 API 报错: {data_hist['msg']}")
             return None
 
-        df_hist = pd.DataFrame(data_hist['data'])
-        df_hist = df_hist[['fundingTime', 'fundingRate', 'realizedRate']]
-        df_hist['type'] = 'Settled'
-
         # 获取当前预测/进行中费率
-        res_curr = requests.get(
-            url_current,
-            params=params_current,
-            proxies=proxies,
-            timeout=DEFAULT_TIMEOUT
-        )
+        res_curr = fut_curr.result()
         res_curr.raise_for_status()
-        data_curr = res_curr.json()
+        data_curr = _parse_json(res_curr)
 
         if data_curr['code'] != '0':
             print(f"当前数据 API 报错: {data_curr['msg']}")
             return None
 
-        # 构建第 0 行数据
+        # 第 0 行为当前预测费率，其后为历史已结算费率：
+        # 先拼接行列表再一次性构建 DataFrame，避免 pd.concat 额外分配与复制
         curr_record = data_curr['data'][0]
-        row_0 = {
-            'fundingTime': curr_record['fundingTime'],
-            'fundingRate': curr_record['fundingRate'],
-            'realizedRate': None,
-            'type': 'Current/Predicted'
-        }
-        df_curr = pd.DataFrame([row_0])
-
-        # 合并 DataFrame
-        df_final = pd.concat([df_curr, df_hist], axis=0, ignore_index=True)
+        rows = [[curr_record['fundingTime'], curr_record['fundingRate'], None, 'Current/Predicted']]
+        rows.extend(
+            [record['fundingTime'], record['fundingRate'], record['realizedRate'], 'Settled']
+            for record in data_hist['data']
+        )
+        df_final = pd.DataFrame(rows, columns=['fundingTime', 'fundingRate', 'realizedRate', 'type'])
 
         # 数据清洗与类型转换
-        df_final['datetime'] = pd.to_datetime(pd.to_numeric(df_final['fundingTime']), unit='ms')
+        df_final['datetime'] = _ts_ms_to_datetime(df_final['fundingTime'])
         df_final['fundingRate'] = pd.to_numeric(df_final['fundingRate'])
         df_final['realizedRate'] = pd.to_numeric(df_final['realizedRate'])
         df_final = df_final[['datetime', 'fundingRate', 'realizedRate', 'type']]
 
-        return df_final
+        return _optimize_dtypes(df_final)
 
     except Exception as e:
         _handle_request_error(e)
         return None
 
 
+@_cached(ttl=_period_ttl('period'))
 def get_okx_open_interest(
     inst_id: str,
     period: str = '1H',
@@ -353,84 +647,67 @@ def get_okx_open_interest(
         >>> print(df.head())
     """
     timeout_seconds = 30
-    max_retries = 3
     proxies = DEFAULT_PROXY if use_proxy else None
-    session = _create_session(max_retries)
 
     url_history = "https://www.okx.com/api/v5/rubik/stat/contracts/open-interest-history"
     url_current_oi = "https://www.okx.com/api/v5/public/open-interest"
-    url_mark_price = "https://www.okx.com/api/v5/public/mark-price"
 
     try:
         print(f"正在获取 {inst_id} 的持仓数据 (周期: {period})...")
 
-        # 1. 获取历史数据 (自带美元价值)
+        # 历史数据与当前持仓互不依赖，并发发出
         params_hist = {"instId": inst_id, "period": period, "limit": limit}
-        res_hist = session.get(
-            url_history,
-            params=params_hist,
-            proxies=proxies,
-            headers=DEFAULT_HEADERS,
-            timeout=timeout_seconds
+        fut_hist, fut_curr = (
+            _EXECUTOR.submit(
+                _SESSION.get,
+                url,
+                params=params,
+                proxies=proxies,
+                timeout=timeout_seconds
+            )
+            for url, params in (
+                (url_history, params_hist),
+                (url_current_oi, {"instId": inst_id}),
+            )
         )
+
+        # 1. 历史数据 (自带美元价值)
+        res_hist = fut_hist.result()
         res_hist.raise_for_status()
-        data_hist = res_hist.json()
+        data_hist = _parse_json(res_hist)
 
         if data_hist['code'] != '0':
             print(f"历史数据报错: {data_hist['msg']}")
             return None
 
-        df_hist = pd.DataFrame(data_hist['data'], columns=['ts', 'oi', 'oiCcy', 'oiUsd'])
-        df_hist = df_hist[['ts', 'oiCcy', 'oiUsd']]
-        df_hist['type'] = 'History'
-
-        # 2. 获取当前实时数据 (需要计算美元价值)
-        res_curr = session.get(
-            url_current_oi,
-            params={"instId": inst_id},
-            proxies=proxies,
-            headers=DEFAULT_HEADERS,
-            timeout=timeout_seconds
-        )
-        curr_data = res_curr.json()['data'][0]
+        # 2. 当前实时数据 (接口直接返回 oiUsd；缺失时用标记价格换算)
+        curr_data = _parse_json(fut_curr.result())['data'][0]
+        if curr_data.get('oiUsd'):
+            current_oi_usd = float(curr_data['oiUsd'])
+        else:
+            current_price = _get_mark_price(inst_id, proxies, timeout_seconds)
+            current_oi_usd = float(curr_data['oiCcy']) * current_price
 
-        # 获取当前标记价格 (用于计算 USD 价值)
-        res_price = session.get(
-            url_mark_price,
-            params={"instId": inst_id},
-            proxies=proxies,
-            headers=DEFAULT_HEADERS,
-            timeout=timeout_seconds
-        )
-        price_data = res_price.json()['data'][0]
-
-        current_oi_ccy = float(curr_data['oiCcy'])
-        current_price = float(price_data['markPx'])
-        current_oi_usd = current_oi_ccy * current_price
-
-        # 构建第0行
-        row_0 = {
-            'ts': curr_data['ts'],
-            'oiCcy': curr_data['oiCcy'],
-            'oiUsd': current_oi_usd,
-            'type': 'Current (Real-time)'
-        }
-        df_curr = pd.DataFrame([row_0])
+        # 3. 第 0 行为当前实时数据，其后为历史快照 (原始列: ts, oi, oiCcy, oiUsd)：
+        # 先拼接行列表再一次性构建 DataFrame，避免 pd.concat 额外分配与复制
+        rows = [[curr_data['ts'], curr_data['oiCcy'], current_oi_usd, 'Current (Real-time)']]
+        rows.extend([record[0], record[2], record[3], 'History'] for record in data_hist['data'])
 
-        # 3. 合并与清洗
-        df_final = pd.concat([df_curr, df_hist], axis=0, ignore_index=True)
-        df_final['datetime'] = pd.to_datetime(pd.to_numeric(df_final['ts']), unit='ms')
+        # 4. 清洗
+        df_final = pd.DataFrame(rows, columns=['ts', 'oiCcy', 'oiUsd', 'type'])
+        df_final['datetime'] = _ts_ms_to_datetime(df_final['ts'])
         df_final['oiCcy'] = pd.to_numeric(df_final['oiCcy'])
         df_final['oiUsd'] = pd.to_numeric(df_final['oiUsd'])
         df_final = df_final[['datetime', 'oiCcy', 'oiUsd', 'type']]
 
-        return df_final
+        return _optimize_dtypes(df_final)
 
     except Exception as e:
         _handle_request_error(e)
         return None
 
 
+@_cached(ttl=_period_ttl('period'))
 def get_long_short_ratio(
     ccy: str,
     period: str = '1H',
@@ -462,49 +739,71 @@ def get_long_short_ratio(
     """
     base_url = "https://www.okx.com/api/v5/rubik/stat/contracts/long-short-account-ratio"
     proxies = DEFAULT_PROXY if use_proxy else None
-    all_records = []
-    end_ts = None
+    page_size = 100  # 单次请求最大值
 
     print(f"正在获取 {ccy} 多空比数据...")
 
-    # 循环获取 (处理 limit > 100 的情况)
-    while len(all_records) < limit:
+    def fetch_page(begin: Optional[int], end: Optional[int]) -> list:
         params = {
             "ccy": ccy,
             "period": period,
-            "limit": 100  # 单次请求最大值
+            "limit": page_size
         }
-        if end_ts:
-            params['end'] = end_ts
+        if begin is not None:
+            params['begin'] = begin
+        if end is not None:
+            params['end'] = end
+
+        with _PAGE_SEMAPHORE:
+            try:
+                response = _SESSION.get(
+                    base_url,
+                    params=params,
+                    proxies=proxies,
+                    timeout=DEFAULT_TIMEOUT
+                )
+                data = _parse_json(response)
+            except Exception as e:
+                _handle_request_error(e)
+                return []
 
-        try:
-            response = requests.get(
-                base_url,
-                params=params,
-                proxies=proxies,
-                timeout=DEFAULT_TIMEOUT
-            )
-            data = response.json()
-
-            if data['code'] != '0':
-                print(f"API 报错: {data['msg']}")
-                break
-
-            records = data['data']
+        if data['code'] != '0':
+            print(f"API 报错: {data['msg']}")
+            return []
+        return data['data']
+
+    # 处理 limit > 100 的情况: 按时间粒度从当前时间向前预先切分时间窗口，
+    # 各窗口互不依赖，可并发请求 (无需等待上一页返回的游标)
+    pages = math.ceil(limit / page_size)
+    step = _PERIOD_MS.get(period)
+    if pages <= 1:
+        all_records = fetch_page(None, None)
+    elif step is None:
+        # 未知时间粒度无法预先切分窗口，沿用 end 游标逐页向前翻
+        all_records = []
+        end_ts = None
+        while len(all_records) < limit:
+            records = fetch_page(None, end_ts)
             if not records:
                 break
-
             end_ts = records[-1][0]
             all_records.extend(records)
-
-            if len(all_records) >= limit:
-                break
-
-            time.sleep(0.1)  # 防止请求过快
-
-        except Exception as e:
-            _handle_request_error(e)
-            break
+            if len(all_records) < limit:
+                time.sleep(0.1)  # 防止请求过快
+    else:
+        now_ts = int(time.time() * 1000)
+        span = page_size * step
+        # 每个窗口向前多覆盖一个粒度，避免边界开闭区间导致漏点 (重复点在下方去重)
+        windows = [(now_ts - (i + 1) * span - step, now_ts - i * span) for i in range(pages)]
+        futures = [_EXECUTOR.submit(fetch_page, b, e) for b, e in windows]
+
+        all_records = []
+        seen_ts = set()
+        for future in futures:
+            for record in future.result():
+                if record[0] not in seen_ts:
+                    seen_ts.add(record[0])
+                    all_records.append(record)
 
     if not all_records:
         return None
@@ -517,21 +816,22 @@ def get_long_short_ratio(
     df = pd.DataFrame(all_records, columns=cols)
 
     # 数据清洗
-    df['datetime'] = pd.to_datetime(pd.to_numeric(df['ts']), unit='ms')
+    df['datetime'] = _ts_ms_to_datetime(df['ts'])
     df['ratio'] = pd.to_numeric(df['ratio'])
     if 'longAccount' in df.columns:
         df['longAccount'] = pd.to_numeric(df['longAccount'])
         df['shortAccount'] = pd.to_numeric(df['shortAccount'])
 
     # 排序：最新的在最上面
-    df = df.sort_values('datetime', ascending=False).reset_index(drop=True)
+    df = _sort_by_datetime(df, ascending=False)
 
     # 强制截断到用户指定的条数
     df = df.iloc[:limit]
 
-    return df
+    return _optimize_dtypes(df)
 
 
+@_cached(ttl=30)
 def get_okx_liquidation(
     inst_id: str,
     state: str = 'filled',
@@ -571,20 +871,20 @@ def get_okx_liquidation(
         "instType": "SWAP",
         "instFamily": inst_family,
         "state": state,
-        "limit": limit
+        "limit": min(max(int(limit), 1), 100)  # 接口上限 100
     }
     proxies = DEFAULT_PROXY if use_proxy else None
 
     try:
         print(f"正在获取 {inst_id} 爆仓数据...")
-        response = requests.get(
+        response = _SESSION.get(
             url,
             params=params,
             proxies=proxies,
             timeout=DEFAULT_TIMEOUT
         )
         response.raise_for_status()
-        data = response.json()
+        data = _parse_json(response)
 
         if data['code'] != '0':
             print(f"API 报错: {data['msg']}")
@@ -595,38 +895,32 @@ def get_okx_liquidation(
             print(f"提示：[{inst_family}] 当前没有最近的爆仓单记录。")
             return None
 
-        # 展开 details 数组
-        all_details = []
-        for item in data_list:
-            for detail in item.get('details', []):
-                all_details.append({
-                    'ts': detail['ts'],
-                    'side': detail['side'],
-                    'bkPx': detail['bkPx'],
-                    'sz': detail['sz']
-                })
-
-        if not all_details:
+        # 展开 details 数组：itemgetter 一次取出 4 个字段为元组，不再逐行构建 dict。
+        # limit 限制的是爆仓单数量，每单可含多条 details，全部保留
+        details = (detail for item in data_list for detail in item.get('details', ()))
+        rows = list(map(_LIQUIDATION_FIELDS, details))
+        if not rows:
             print(f"提示：[{inst_family}] 爆仓数据 details 为空。")
             return None
 
-        df = pd.DataFrame(all_details)
+        df = pd.DataFrame(rows, columns=['ts', 'side', 'bkPx', 'sz'])
 
         # 数据处理
-        df['datetime'] = pd.to_datetime(pd.to_numeric(df['ts']), unit='ms')
+        df['datetime'] = _ts_ms_to_datetime(df['ts'])
         df['bkPx'] = pd.to_numeric(df['bkPx'])
         df['sz'] = pd.to_numeric(df['sz'])
         df = df[['datetime', 'side', 'bkPx', 'sz']]
 
         # 按时间降序排列
-        df = df.sort_values('datetime', ascending=False).reset_index(drop=True)
-        return df
+        df = _sort_by_datetime(df, ascending=False)
+        return _optimize_dtypes(df)
 
     except Exception as e:
         _handle_request_error(e)
         return None
 
 
+@_cached(ttl=_period_ttl('period'))
 def get_top_trader_long_short_position_ratio(
     inst_id: str,
     period: str = '5m',
@@ -681,14 +975,14 @@ def get_top_trader_long_short_position_ratio(
 
     try:
         print(f"正在获取 {inst_id} 精英交易员多空持仓仓位比 (周期: {period})...")
-        response = requests.get(
+        response = _SESSION.get(
             url,
             params=params,
             proxies=proxies,
             timeout=DEFAULT_TIMEOUT
         )
         response.raise_for_status()
-        data = response.json()
+        data = _parse_json(response)
 
         if data['code'] != '0':
             print(f"API 报错: {data['msg']}")
@@ -703,19 +997,20 @@ def get_top_trader_long_short_position_ratio(
         df = pd.DataFrame(records, columns=['ts', 'longShortPosRatio'])
 
         # 数据清洗
-        df['datetime'] = pd.to_datetime(pd.to_numeric(df['ts']), unit='ms')
+        df['datetime'] = _ts_ms_to_datetime(df['ts'])
         df['longShortPosRatio'] = pd.to_numeric(df['longShortPosRatio'])
         df = df[['datetime', 'longShortPosRatio']]
 
         # 按时间降序排列
-        df = df.sort_values('datetime', ascending=False).reset_index(drop=True)
-        return df
+        df = _sort_by_datetime(df, ascending=False)
+        return _optimize_dtypes(df)
 
     except Exception as e:
         _handle_request_error(e)
         return None
 
 
+@_cached(ttl=_period_ttl('period'))
 def get_option_open_interest_volume_ratio(
     ccy: str,
     period: str = '8H',
@@ -753,14 +1048,14 @@ def get_option_open_interest_volume_ratio(
 
     try:
         print(f"正在获取 {ccy} 期权看涨/看跌持仓量和交易量比 (周期: {period})...")
-        response = requests.get(
+        response = _SESSION.get(
             url,
             params=params,
             proxies=proxies,
             timeout=DEFAULT_TIMEOUT
         )
         response.raise_for_status()
-        data = response.json()
+        data = _parse_json(response)
 
         if data['code'] != '0':
             print(f"API 报错: {data['msg']}")
@@ -775,32 +1070,102 @@ def get_option_open_interest_volume_ratio(
         df = pd.DataFrame(records, columns=['ts', 'oiRatio', 'volRatio'])
 
         # 数据清洗
-        df['datetime'] = pd.to_datetime(pd.to_numeric(df['ts']), unit='ms')
+        df['datetime'] = _ts_ms_to_datetime(df['ts'])
         df['oiRatio'] = pd.to_numeric(df['oiRatio'])
         df['volRatio'] = pd.to_numeric(df['volRatio'])
         df = df[['datetime', 'oiRatio', 'volRatio']]
 
         # 按时间降序排列
-        df = df.sort_values('datetime', ascending=False).reset_index(drop=True)
-        return df
+        df = _sort_by_datetime(df, ascending=False)
+        return _optimize_dtypes(df)
 
     except Exception as e:
         _handle_request_error(e)
         return None
 
 
+def get_okx_market_snapshot(
+    inst_id: str,
+    bar: str = '1H',
+    limit: int = 100,
+    use_proxy: bool = False
+) -> Dict[str, Optional[pd.DataFrame]]:
+    """
+    并发获取单个品种的 K线、资金费率、持仓量、多空比与爆仓数据。
+
+    五个接口互不依赖，一次性并发发出，总耗时约等于最慢的那个请求，
+    而不是五次请求耗时之和。
+
+    Args:
+        inst_id: 交易对或永续合约，如 'BTC-USDT' 或 'BTC-USDT-SWAP'
+        bar: K线周期，同时作为持仓量/多空比的时间粒度
+        limit: 各接口返回数据条数
+        use_proxy: 是否使用代理
+
+    Returns:
+        字典，键为 'candles', 'funding_rate', 'open_interest',
+        'long_short_ratio', 'liquidation'，值为对应 DataFrame (失败为 None)
+
+    Example:
+        >>> snapshot = get_okx_market_snapshot("BTC-USDT", bar="1H", limit=50)
+        >>> print(snapshot['funding_rate'].head())
+    """
+    # 从 inst_id 推导现货 / 永续 / 币种 (BTC-USDT-SWAP -> BTC-USDT / BTC)
+    spot_id = inst_id[:-5] if inst_id.endswith('-SWAP') else inst_id
+    swap_id = f"{spot_id}-SWAP"
+    ccy = spot_id.split('-')[0]
+
+    calls = {
+        'candles': (get_okx_candles, (spot_id, bar, limit, use_proxy)),
+        'funding_rate': (get_okx_funding_rate, (swap_id, limit, use_proxy)),
+        'open_interest': (get_okx_open_interest, (swap_id, bar, limit, use_proxy)),
+        'long_short_ratio': (get_long_short_ratio, (ccy, bar, limit, use_proxy)),
+        'liquidation': (get_okx_liquidation, (swap_id, 'filled', limit, use_proxy)),
+    }
+
+    # 使用独立线程池：内部函数还会向 _EXECUTOR 提交子请求，共用会有死锁风险
+    with ThreadPoolExecutor(max_workers=len(calls)) as executor:
+        futures = {name: executor.submit(fn, *args) for name, (fn, args) in calls.items()}
+        return {name: future.result() for name, future in futures.items()}
+
+
 # ==============================================================================
 # 便捷导出函数
 # ==============================================================================
 
+def save_to_parquet(df: pd.DataFrame, filename: str) -> None:
+    """
+    将 DataFrame 保存为 Parquet 文件 (zstd 压缩)。
+
+    相比 CSV 体积更小，并保留 datetime / float / category 等列类型，读取时无需重新解析。
+    需要安装 pyarrow。
+
+    Args:
+        df: 要保存的 DataFrame
+        filename: 文件名，建议以 .parquet 结尾
+    """
+    if df is not None:
+        df.to_parquet(filename, engine='pyarrow', compression='zstd', index=False)
+        print(f"数据已保存到 {filename}")
+    else:
+        print("DataFrame 为空，无法保存")
+
+
 def save_to_csv(df: pd.DataFrame, filename: str) -> None:
     """
     将 DataFrame 保存为 CSV 文件。
 
+    已弃用：CSV 会丢失列类型且体积较大，请改用 save_to_parquet。
+
     Args:
         df: 要保存的 DataFrame
         filename: 文件名
     """
+    warnings.warn(
+        "save_to_csv 已弃用，请改用 save_to_parquet",
+        DeprecationWarning,
+        stacklevel=2
+    )
     if df is not None:
         df.to_csv(filename, index=False)
         print(f"数据已保存到 {filename}")
@@ -17,24 +17,41 @@ CryptoView MCP Server
     }
 """
 
+import io
 import json
+import os
 import sys
-from typing import Any
+import threading
+import time
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+from typing import TYPE_CHECKING, Any, Optional, Tuple, Union
 
-# 导入你的数据模块
-from crypto_data import (
-    get_okx_candles,
-    get_okx_funding_rate,
-    get_okx_open_interest,
-    get_long_short_ratio,
-    get_okx_liquidation,
-    get_top_trader_long_short_position_ratio,
-    get_option_open_interest_volume_ratio,
-    get_fear_greed_index
-)
+try:
+    import orjson
+except ImportError:  # 未安装 orjson 时退回标准库 json
+    orjson = None
 
-# 导入技术分析模块
-from technical_analysis import TechnicalAnalysis, _analyze_single_asset
+if TYPE_CHECKING:
+    from technical_analysis import TechnicalAnalysis
+
+
+# ==============================================================================
+# 延迟导入：crypto_data / technical_analysis 依赖 pandas、numpy、requests，冷启动需数百毫秒。
+# 首次 tools/call 时才导入，仅做 initialize + tools/list 的会话 (如客户端探测) 无需承担该开销；
+# 模块导入由解释器的导入锁保证线程安全，此后调用仅为 sys.modules 查找
+# ==============================================================================
+
+def _data_module():
+    """返回数据模块 crypto_data (首次调用时导入)"""
+    import crypto_data
+    return crypto_data
+
+
+def _analysis_module():
+    """返回技术分析模块 technical_analysis (首次调用时导入)"""
+    import technical_analysis
+    return technical_analysis
 
 
 # ==============================================================================
@@ -42,17 +59,140 @@ from technical_analysis import TechnicalAnalysis, _analyze_single_asset
 # ==============================================================================
 
 # ==============================================================================
-# K线数据缓存：key = (inst_id, bar)，value = List[Dict] (records格式)
+# K线数据缓存：key = (inst_id, bar)，value = get_okx_candles 返回的 DataFrame
 # 当 get_candles 被调用后自动填充，供后续分析工具复用，避免重复请求
 # ==============================================================================
 _candles_cache: dict = {}
 
+# JSON-RPC 输出流，由 main() 接管 stdout 后设置；未设置时 (如被其他模块导入) 写 sys.stdout
+_protocol_out: Optional[io.BufferedWriter] = None
+
+# tools/call 成功响应的外层帧：工具结果文本在填入时只转义一次，不再连同外层 dict 整体二次序列化。
+# 帧按字节段拆开，响应以 (头, id, 中段, 结果文本, 尾) 元组传递，写出时逐段写入缓冲，不拼接复制大段结果
+_TOOL_RESULT_HEAD = b'{"jsonrpc":"2.0","id":'
+_TOOL_RESULT_BODY = b',"result":{"content":[{"type":"text","text":'
+_TOOL_RESULT_TAIL = b'}]}}'
+
+# 错误响应的外层帧，按错误码预先序列化
+_ERROR_HEAD = b'{"jsonrpc":"2.0","id":'
+_ERROR_CODES = {
+    code: b',"error":{"code":%d,"message":' % code
+    for code in (-32600, -32601, -32602, -32603)
+}
+_ERROR_TAIL = b'}}'
 
-def send_response(response: dict) -> None:
-    """发送 JSON-RPC 响应"""
-    output = json.dumps(response) + "\n"
-    sys.stdout.write(output)
+# ==============================================================================
+# 数据工具结果缓存 (LRU)：key = (tool_name, 参数)，value = (过期时刻, DataFrame, 已转义的结果 bytes)
+# 命中时跳过获取、序列化与转义，只需填入 id；有效期沿用 crypto_data 中各接口的 TTL
+# ==============================================================================
+_RESULT_CACHE_SIZE = 64
+_result_cache: "OrderedDict[tuple, tuple]" = OrderedDict()
+_result_cache_lock = threading.Lock()
+
+# 工具调用的并发执行线程池：逐行到达的 tools/call 与批量请求 (JSON-RPC batch) 共用
+_EXECUTOR = ThreadPoolExecutor(max_workers=8, thread_name_prefix="mcp")
+
+# 多个工作线程会同时写出响应，整条消息的 write + flush 需串行
+_send_lock = threading.Lock()
+
+
+def _take_over_stdout() -> io.BufferedWriter:
+    """
+    接管 stdout：复制原 fd 作为 JSON-RPC 专用输出流 (64K 缓冲)，再将 fd 1 重定向到 /dev/null。
+
+    此后 crypto_data 等模块的 print (以及任何直接写 fd 1 的输出) 都被丢弃，不会混入协议输出，
+    无需在每次工具调用时 redirect_stdout。直接包装 raw fd 而非再套一层 BufferedWriter：
+    两层缓冲叠加时外层 flush 不会穿透内层，响应可能滞留导致客户端挂起。
+    """
     sys.stdout.flush()
+    stdout_fd = sys.stdout.fileno()
+    protocol_fd = os.dup(stdout_fd)
+    devnull = os.open(os.devnull, os.O_WRONLY)
+    os.dup2(devnull, stdout_fd)
+    os.close(devnull)
+
+    return io.BufferedWriter(io.FileIO(protocol_fd, "wb", closefd=True), buffer_size=65536)
+
+
+def _loads(line: bytes) -> Any:
+    """
+    解析一行请求：优先 orjson (直接接受 bytes，首尾空白无需 strip)，否则退回标准库 json。
+
+    orjson.JSONDecodeError 是 json.JSONDecodeError 的子类，调用方统一捕获后者即可。
+    """
+    if orjson is not None:
+        return orjson.loads(line)
+    return json.loads(line)
+
+
+def _iter_stdin_lines():
+    """
+    逐条产出 stdin 上的请求行 (bytes，不含换行符)。
+
+    以二进制块读取 stdin 并在用户态按 b"\\n" 切分：跳过文本层的逐行解码，
+    客户端流水线发送的多条请求一次 read 即可全部取出；read1 有数据即返回，不会等满缓冲。
+    """
+    reader = io.BufferedReader(io.FileIO(sys.stdin.fileno(), "rb", closefd=False), buffer_size=65536)
+    pending = b""
+    while True:
+        chunk = reader.read1(65536)
+        if not chunk:
+            break
+        lines = chunk.split(b"\n")
+        lines[0] = pending + lines[0]
+        pending = lines.pop()
+        yield from lines
+    if pending:
+        yield pending
+
+
+def _encode(obj: Any) -> bytes:
+    """序列化为紧凑的 UTF-8 JSON：优先 orjson，遇到其不支持的值 (如超 64 位整数) 时退回标准库 json"""
+    if orjson is not None:
+        try:
+            return orjson.dumps(obj)
+        except TypeError:  # orjson.JSONEncodeError 是 TypeError 的子类
+            pass
+    return json.dumps(obj, ensure_ascii=False).encode("utf-8")
+
+
+def _error_response(request_id: Any, code: int, message: str) -> Tuple[bytes, ...]:
+    """
+    构建错误响应的字节段元组：外层帧为预先序列化的常量，不再每次构建 dict 再整体序列化；
+    id 与 message 来自客户端或异常文本，仍经 _encode 转义后填入。
+    """
+    return (_ERROR_HEAD, _encode(request_id), _ERROR_CODES[code], _encode(message), _ERROR_TAIL)
+
+
+def _segments(response: Union[dict, Tuple[bytes, ...]]) -> Tuple[bytes, ...]:
+    """单条响应 → 字节段元组；已序列化的响应本身即为字节段元组"""
+    if isinstance(response, tuple):
+        return response
+    return (_encode(response),)
+
+
+def send_response(response: Union[dict, list, Tuple[bytes, ...]]) -> None:
+    """
+    发送 JSON-RPC 响应：dict 或已序列化的字节段元组为单条响应，list 为批量响应数组。
+
+    各字节段依次直接写入 64K 缓冲 (超过缓冲大小的段直接交给内核)，不先拼接成整条消息，
+    大段结果文本不会多复制一遍；整条消息写完后只 flush 一次。
+    """
+    if isinstance(response, list):
+        parts = [b"["]
+        for i, item in enumerate(response):
+            if i:
+                parts.append(b",")
+            parts.extend(_segments(item))
+        parts.append(b"]\n")
+    else:
+        parts = [*_segments(response), b"\n"]
+
+    out = _protocol_out or sys.stdout.buffer
+    with _send_lock:
+        for part in parts:
+            out.write(part)
+        out.flush()
 
 
 def handle_initialize(request_id: Any) -> dict:
@@ -73,270 +213,274 @@ def handle_initialize(request_id: Any) -> dict:
     }
 
 
-def handle_tools_list(request_id: Any) -> dict:
-    """返回可用工具列表"""
-    tools = [
-        {
-            "name": "get_candles",
-            "description": "获取 OKX 交易对的 K 线数据。支持 BTC-USDT, ETH-USDT, BNB-USDT, ZEC-USDT 等。",
-            "inputSchema": {
-                "type": "object",
-                "properties": {
-                    "inst_id": {
-                        "type": "string",
-                        "description": "交易对，如 'BTC-USDT', 'ETH-USDT'"
-                    },
-                    "bar": {
-                        "type": "string",
-                        "description": "K线周期: '1m', '5m', '15m', '30m', '1H', '4H', '1D', '1W'",
-                        "default": "1H"
-                    },
-                    "limit": {
-                        "type": "integer",
-                        "description": "返回数据条数，最大 100",
-                        "default": 100
-                    }
+# ==============================================================================
+# 工具列表：静态内容，模块加载时构建一次，tools/list 直接复用
+# ==============================================================================
+_TOOLS_LIST = [
+    {
+        "name": "get_candles",
+        "description": "获取 OKX 交易对的 K 线数据。支持 BTC-USDT, ETH-USDT, BNB-USDT, ZEC-USDT 等。",
+        "inputSchema": {
+            "type": "object",
+            "properties": {
+                "inst_id": {
+                    "type": "string",
+                    "description": "交易对，如 'BTC-USDT', 'ETH-USDT'"
                 },
-                "required": ["inst_id"]
-            }
-        },
-        {
-            "name": "get_funding_rate",
-            "description": "获取永续合约的资金费率。用于判断市场多空情绪。",
-            "inputSchema": {
-                "type": "object",
-                "properties": {
-                    "inst_id": {
-                        "type": "string",
-                        "description": "永续合约交易对，如 'BTC-USDT-SWAP', 'ETH-USDT-SWAP'"
-                    },
-                    "limit": {
-                        "type": "integer",
-                        "description": "历史数据条数",
-                        "default": 100
-                    }
+                "bar": {
+                    "type": "string",
+                    "description": "K线周期: '1m', '5m', '15m', '30m', '1H', '4H', '1D', '1W'",
+                    "default": "1H"
                 },
-                "required": ["inst_id"]
-            }
-        },
-        {
-            "name": "get_open_interest",
-            "description": "获取未平仓合约量 (Open Interest)，包含美元价值。用于分析市场杠杆情况。",
-            "inputSchema": {
-                "type": "object",
-                "properties": {
-                    "inst_id": {
-                        "type": "string",
-                        "description": "永续合约交易对，如 'BTC-USDT-SWAP'"
-                    },
-                    "period": {
-                        "type": "string",
-                        "description": "时间粒度: '5m', '1H', '1D'",
-                        "default": "1H"
-                    },
-                    "limit": {
-                        "type": "integer",
-                        "description": "历史数据条数",
-                        "default": 100
-                    }
+                "limit": {
+                    "type": "integer",
+                    "description": "返回数据条数，最大 100",
+                    "default": 100
+                }
+            },
+            "required": ["inst_id"]
+        }
+    },
+    {
+        "name": "get_funding_rate",
+        "description": "获取永续合约的资金费率。用于判断市场多空情绪。",
+        "inputSchema": {
+            "type": "object",
+            "properties": {
+                "inst_id": {
+                    "type": "string",
+                    "description": "永续合约交易对，如 'BTC-USDT-SWAP', 'ETH-USDT-SWAP'"
                 },
-                "required": ["inst_id"]
-            }
-        },
-        {
-            "name": "get_long_short_ratio",
-            "description": "获取精英交易员多空持仓人数比。用于判断散户情绪。",
-            "inputSchema": {
-                "type": "object",
-                "properties": {
-                    "ccy": {
-                        "type": "string",
-                        "description": "币种，如 'BTC', 'ETH'"
-                    },
-                    "period": {
-                        "type": "string",
-                        "description": "时间粒度: '5m', '1H', '1D'",
-                        "default": "1H"
-                    },
-                    "limit": {
-                        "type": "integer",
-                        "description": "返回数据条数",
-                        "default": 100
-                    }
+                "limit": {
+                    "type": "integer",
+                    "description": "历史数据条数",
+                    "default": 100
+                }
+            },
+            "required": ["inst_id"]
+        }
+    },
+    {
+        "name": "get_open_interest",
+        "description": "获取未平仓合约量 (Open Interest)，包含美元价值。用于分析市场杠杆情况。",
+        "inputSchema": {
+            "type": "object",
+            "properties": {
+                "inst_id": {
+                    "type": "string",
+                    "description": "永续合约交易对，如 'BTC-USDT-SWAP'"
                 },
-                "required": ["ccy"]
-            }
-        },
-        {
-            "name": "get_liquidation",
-            "description": "获取 OKX 交易对的历史爆仓数据统计。用于分析市场强制平仓情况和极端行情。",
-            "inputSchema": {
-                "type": "object",
-                "properties": {
-                    "inst_id": {
-                        "type": "string",
-                        "description": "交易对，如 'BTC-USDT-SWAP', 'ETH-USDT-SWAP'"
-                    },
-                    "state": {
-                        "type": "string",
-                        "description": "订单状态: 'filled' (已成交), 'unfilled' (未成交)",
-                        "default": "filled"
-                    },
-                    "limit": {
-                        "type": "integer",
-                        "description": "返回数据条数，最大 100",
-                        "default": 100
-                    }
+                "period": {
+                    "type": "string",
+                    "description": "时间粒度: '5m', '1H', '1D'",
+                    "default": "1H"
                 },
-                "required": ["inst_id"]
-            }
-        },
-        {
-            "name": "get_top_trader_position_ratio",
-            "description": "获取精英交易员合约多空持仓仓位比。精英交易员指持仓价值前5%的用户。用于判断大户持仓方向。",
-            "inputSchema": {
-                "type": "object",
-                "properties": {
-                    "inst_id": {
-                        "type": "string",
-                        "description": "产品ID，如 'BTC-USDT-SWAP', 'ETH-USDT-SWAP' (仅适用于交割/永续)"
-                    },
-                    "period": {
-                        "type": "string",
-                        "description": "时间粒度: '5m', '15m', '30m', '1H', '2H', '4H', '6H', '12H', '1D'",
-                        "default": "5m"
-                    },
-                    "limit": {
-                        "type": "integer",
-                        "description": "返回数据条数，最大 100",
-                        "default": 100
-                    }
+                "limit": {
+                    "type": "integer",
+                    "description": "历史数据条数",
+                    "default": 100
+                }
+            },
+            "required": ["inst_id"]
+        }
+    },
+    {
+        "name": "get_long_short_ratio",
+        "description": "获取精英交易员多空持仓人数比。用于判断散户情绪。",
+        "inputSchema": {
+            "type": "object",
+            "properties": {
+                "ccy": {
+                    "type": "string",
+                    "description": "币种，如 'BTC', 'ETH'"
                 },
-                "required": ["inst_id"]
-            }
-        },
-        {
-            "name": "get_option_oi_volume_ratio",
-            "description": "获取看涨/看跌期权合约的持仓总量比和交易总量比。用于分析期权市场情绪。oiRatio > 1 表示看涨期权持仓多于看跌。",
-            "inputSchema": {
-                "type": "object",
-                "properties": {
-                    "ccy": {
-                        "type": "string",
-                        "description": "币种，如 'BTC', 'ETH'"
-                    },
-                    "period": {
-                        "type": "string",
-                        "description": "时间粒度: '8H' 或 '1D'",
-                        "default": "8H"
-                    }
+                "period": {
+                    "type": "string",
+                    "description": "时间粒度: '5m', '1H', '1D'",
+                    "default": "1H"
                 },
-                "required": ["ccy"]
-            }
-        },
-        {
-            "name": "get_fear_greed_index",
-            "description": "获取 Fear and Greed Index (恐惧贪婪指数)。0-24: 极度恐惧, 25-49: 恐惧, 50-74: 贪婪, 75-100: 极度贪婪。",
-            "inputSchema": {
-                "type": "object",
-                "properties": {
-                    "days": {
-                        "type": "integer",
-                        "description": "获取过去多少天的数据",
-                        "default": 7
-                    }
+                "limit": {
+                    "type": "integer",
+                    "description": "返回数据条数",
+                    "default": 100
+                }
+            },
+            "required": ["ccy"]
+        }
+    },
+    {
+        "name": "get_liquidation",
+        "description": "获取 OKX 交易对的历史爆仓数据统计。用于分析市场强制平仓情况和极端行情。",
+        "inputSchema": {
+            "type": "object",
+            "properties": {
+                "inst_id": {
+                    "type": "string",
+                    "description": "交易对，如 'BTC-USDT-SWAP', 'ETH-USDT-SWAP'"
                 },
-                "required": []
-            }
-        },
-        {
-            "name": "get_analysis_summary",
-            "description": "获取交易对的技术分析摘要，包含：当前价格、MA5/MA20、RSI14、MACD_DIF、ADX、斐波那契回撤位、区间涨跌幅%。适合快速判断趋势方向和强度。",
-            "inputSchema": {
-                "type": "object",
-                "properties": {
-                    "inst_id": {
-                        "type": "string",
-                        "description": "交易对，如 'BTC-USDT', 'ETH-USDT'"
-                    },
-                    "bar": {
-                        "type": "string",
-                        "description": "K线周期: '1m','5m','15m','30m','1H','4H','1D','1W'",
-                        "default": "1D"
-                    },
-                    "limit": {
-                        "type": "integer",
-                        "description": "用于计算的K线数量，建议 ≥ 50",
-                        "default": 100
-                    }
+                "state": {
+                    "type": "string",
+                    "description": "订单状态: 'filled' (已成交), 'unfilled' (未成交)",
+                    "default": "filled"
                 },
-                "required": ["inst_id"]
-            }
-        },
-        {
-            "name": "get_all_indicators",
-            "description": "获取交易对完整技术指标序列，包含：MA5/10/20/50、EMA12/26、RSI6/14、MACD(DIF/DEA/柱)、KDJ(K/D/J)、DMI(+DI/-DI/ADX)、布林带(上/中/下轨/带宽)、ATR14、OBV、价格变化%(1/5/20周期)、成交量变化%。通过 last_n 控制返回行数避免数据过多。",
-            "inputSchema": {
-                "type": "object",
-                "properties": {
-                    "inst_id": {
-                        "type": "string",
-                        "description": "交易对，如 'BTC-USDT', 'ETH-USDT'"
-                    },
-                    "bar": {
-                        "type": "string",
-                        "description": "K线周期: '1m','5m','15m','30m','1H','4H','1D','1W'",
-                        "default": "1D"
-                    },
-                    "limit": {
-                        "type": "integer",
-                        "description": "获取的K线数量，最大100，建议 ≥ 50 保证指标准确",
-                        "default": 100
-                    },
-                    "last_n": {
-                        "type": "integer",
-                        "description": "只返回最新的 N 行结果，默认 10",
-                        "default": 10
-                    }
+                "limit": {
+                    "type": "integer",
+                    "description": "返回数据条数，最大 100",
+                    "default": 100
+                }
+            },
+            "required": ["inst_id"]
+        }
+    },
+    {
+        "name": "get_top_trader_position_ratio",
+        "description": "获取精英交易员合约多空持仓仓位比。精英交易员指持仓价值前5%的用户。用于判断大户持仓方向。",
+        "inputSchema": {
+            "type": "object",
+            "properties": {
+                "inst_id": {
+                    "type": "string",
+                    "description": "产品ID，如 'BTC-USDT-SWAP', 'ETH-USDT-SWAP' (仅适用于交割/永续)"
                 },
-                "required": ["inst_id"]
-            }
-        },
-        {
-            "name": "get_support_resistance",
-            "description": "获取交易对的支撑位列表、阻力位列表，以及斐波那契回撤关键价位(0/0.236/0.382/0.5/0.618/0.786/1.0)。适合判断买卖价格区间。",
-            "inputSchema": {
-                "type": "object",
-                "properties": {
-                    "inst_id": {
-                        "type": "string",
-                        "description": "交易对，如 'BTC-USDT'"
-                    },
-                    "bar": {
-                        "type": "string",
-                        "description": "K线周期",
-                        "default": "1D"
-                    },
-                    "limit": {
-                        "type": "integer",
-                        "description": "K线数量",
-                        "default": 100
-                    },
-                    "window": {
-                        "type": "integer",
-                        "description": "判断极值点的窗口大小，越大筛选越严格",
-                        "default": 5
-                    }
+                "period": {
+                    "type": "string",
+                    "description": "时间粒度: '5m', '15m', '30m', '1H', '2H', '4H', '6H', '12H', '1D'",
+                    "default": "5m"
                 },
-                "required": ["inst_id"]
-            }
+                "limit": {
+                    "type": "integer",
+                    "description": "返回数据条数，最大 100",
+                    "default": 100
+                }
+            },
+            "required": ["inst_id"]
+        }
+    },
+    {
+        "name": "get_option_oi_volume_ratio",
+        "description": "获取看涨/看跌期权合约的持仓总量比和交易总量比。用于分析期权市场情绪。oiRatio > 1 表示看涨期权持仓多于看跌。",
+        "inputSchema": {
+            "type": "object",
+            "properties": {
+                "ccy": {
+                    "type": "string",
+                    "description": "币种，如 'BTC', 'ETH'"
+                },
+                "period": {
+                    "type": "string",
+                    "description": "时间粒度: '8H' 或 '1D'",
+                    "default": "8H"
+                }
+            },
+            "required": ["ccy"]
+        }
+    },
+    {
+        "name": "get_fear_greed_index",
+        "description": "获取 Fear and Greed Index (恐惧贪婪指数)。0-24: 极度恐惧, 25-49: 恐惧, 50-74: 贪婪, 75-100: 极度贪婪。",
+        "inputSchema": {
+            "type": "object",
+            "properties": {
+                "days": {
+                    "type": "integer",
+                    "description": "获取过去多少天的数据",
+                    "default": 7
+                }
+            },
+            "required": []
+        }
+    },
+    {
+        "name": "get_analysis_summary",
+        "description": "获取交易对的技术分析摘要，包含：当前价格、MA5/MA20、RSI14、MACD_DIF、ADX、斐波那契回撤位、区间涨跌幅%。适合快速判断趋势方向和强度。",
+        "inputSchema": {
+            "type": "object",
+            "properties": {
+                "inst_id": {
+                    "type": "string",
+                    "description": "交易对，如 'BTC-USDT', 'ETH-USDT'"
+                },
+                "bar": {
+                    "type": "string",
+                    "description": "K线周期: '1m','5m','15m','30m','1H','4H','1D','1W'",
+                    "default": "1D"
+                },
+                "limit": {
+                    "type": "integer",
+                    "description": "用于计算的K线数量，建议 ≥ 50",
+                    "default": 100
+                }
+            },
+            "required": ["inst_id"]
+        }
+    },
+    {
+        "name": "get_all_indicators",
+        "description": "获取交易对完整技术指标序列，包含：MA5/10/20/50、EMA12/26、RSI6/14、MACD(DIF/DEA/柱)、KDJ(K/D/J)、DMI(+DI/-DI/ADX)、布林带(上/中/下轨/带宽)、ATR14、OBV、价格变化%(1/5/20周期)、成交量变化%。通过 last_n 控制返回行数避免数据过多。",
+        "inputSchema": {
+            "type": "object",
+            "properties": {
+                "inst_id": {
+                    "type": "string",
+                    "description": "交易对，如 'BTC-USDT', 'ETH-USDT'"
+                },
+                "bar": {
+                    "type": "string",
+                    "description": "K线周期: '1m','5m','15m','30m','1H','4H','1D','1W'",
+                    "default": "1D"
+                },
+                "limit": {
+                    "type": "integer",
+                    "description": "获取的K线数量，最大100，建议 ≥ 50 保证指标准确",
+                    "default": 100
+                },
+                "last_n": {
+                    "type": "integer",
+                    "description": "只返回最新的 N 行结果，默认 10",
+                    "default": 10
+                }
+            },
+            "required": ["inst_id"]
+        }
+    },
+    {
+        "name": "get_support_resistance",
+        "description": "获取交易对的支撑位列表、阻力位列表，以及斐波那契回撤关键价位(0/0.236/0.382/0.5/0.618/0.786/1.0)。适合判断买卖价格区间。",
+        "inputSchema": {
+            "type": "object",
+            "properties": {
+                "inst_id": {
+                    "type": "string",
+                    "description": "交易对，如 'BTC-USDT'"
+                },
+                "bar": {
+                    "type": "string",
+                    "description": "K线周期",
+                    "default": "1D"
+                },
+                "limit": {
+                    "type": "integer",
+                    "description": "K线数量",
+                    "default": 100
+                },
+                "window": {
+                    "type": "integer",
+                    "description": "判断极值点的窗口大小，越大筛选越严格",
+                    "default": 5
+                }
+            },
+            "required": ["inst_id"]
         }
-    ]
-    
+    }
+]
+
+
+def handle_tools_list(request_id: Any) -> dict:
+    """返回可用工具列表"""
     return {
         "jsonrpc": "2.0",
         "id": request_id,
-        "result": {"tools": tools}
+        "result": {"tools": _TOOLS_LIST}
     }
 
 
@@ -372,7 +516,13 @@ def _clean_record(record: dict) -> dict:
 
 
 def _clean_df_to_records(df) -> list:
-    """DataFrame → list[dict]，完整清洗"""
+    """DataFrame → list[dict]，完整清洗；datetime 列整列一次转为 ISO 字符串，不再逐值 isoformat()"""
+    iso = {
+        name: df[name].to_numpy().astype("datetime64[s]").astype(str)
+        for name in df.columns if df[name].dtype.kind == "M"
+    }
+    if iso:
+        df = df.assign(**iso)
     return [_clean_record(row) for row in df.to_dict(orient="records")]
 
 
@@ -385,291 +535,318 @@ def _clean_any(obj):
     return _clean_value(obj)
 
 
-def handle_tool_call(request_id: Any, params: dict) -> dict:
+def _dumps(obj) -> str:
+    """
+    将工具结果序列化为缩进 JSON 文本。
+
+    优先使用 orjson (C 实现，浮点数以 ryu 最短往返表示格式化，不经 Python float repr)；
+    pandas Timestamp 等非原生类型经 default=str 输出，与此前逐行 str(row["datetime"]) 的格式一致。
+    """
+    if orjson is not None:
+        return orjson.dumps(
+            obj,
+            default=str,
+            option=orjson.OPT_INDENT_2 | orjson.OPT_SERIALIZE_NUMPY
+        ).decode()
+    return json.dumps(obj, indent=2, ensure_ascii=False, default=str)
+
+
+def _df_to_json(df) -> str:
+    """
+    DataFrame → records 格式 JSON 文本。
+
+    每列一次性 tolist() 后按行拼装，跳过 to_dict(orient="records") 的逐单元格装箱；
+    datetime 列整列转为字符串，不再逐行改写。未用 df.to_json：其浮点输出最多 15 位有效数字，有损。
+
+    datetime 文本与逐个 str(Timestamp) 一致：整秒为 "YYYY-MM-DD HH:MM:SS"，否则带 6 位
+    微秒 (如 "...32.308000")，NaT 为 "NaT"。astype(str) 会按整列精度统一补齐小数位，不能直接用。
+    """
+    names = [str(name) for name in df.columns]
+    columns = []
+    for name in df.columns:
+        col = df[name]
+        if col.dtype.kind == "M":
+            text = col.dt.strftime("%Y-%m-%d %H:%M:%S.%f")
+            col = text.where(col.dt.microsecond != 0, text.str[:19]).fillna("NaT")
+        columns.append(col.tolist())
+    return _dumps([dict(zip(names, row)) for row in zip(*columns)])
+
+
+# ==============================================================================
+# 工具分发表
+# ==============================================================================
+
+# 数据类工具：name -> (crypto_data 中的获取函数名, 必填参数, 可选参数默认值, 错误提示中的数据名称)
+_DATA_TOOLS = {
+    "get_candles": (
+        "get_okx_candles", ("inst_id",), {"bar": "1H", "limit": 100}, "candle data"
+    ),
+    "get_funding_rate": (
+        "get_okx_funding_rate", ("inst_id",), {"limit": 100}, "funding rate data"
+    ),
+    "get_open_interest": (
+        "get_okx_open_interest", ("inst_id",), {"period": "1H", "limit": 100}, "open interest data"
+    ),
+    "get_long_short_ratio": (
+        "get_long_short_ratio", ("ccy",), {"period": "1H", "limit": 100}, "long/short ratio data"
+    ),
+    "get_liquidation": (
+        "get_okx_liquidation", ("inst_id",), {"state": "filled", "limit": 100}, "liquidation data"
+    ),
+    "get_top_trader_position_ratio": (
+        "get_top_trader_long_short_position_ratio", ("inst_id",), {"period": "5m", "limit": 100},
+        "top trader position ratio data"
+    ),
+    "get_option_oi_volume_ratio": (
+        "get_option_open_interest_volume_ratio", ("ccy",), {"period": "8H"},
+        "option OI/volume ratio data"
+    ),
+    "get_fear_greed_index": (
+        "get_fear_greed_index", (), {"days": 7}, "fear and greed index data"
+    ),
+}
+
+
+def _result_cache_get(key):
+    """读取未过期的工具结果，返回 (DataFrame, 已转义的结果 bytes) 或 None"""
+    with _result_cache_lock:
+        entry = _result_cache.get(key)
+        if entry is None:
+            return None
+        if entry[0] <= time.monotonic():
+            del _result_cache[key]
+            return None
+        _result_cache.move_to_end(key)
+        return entry[1], entry[2]
+
+
+def _result_cache_put(key, ttl: int, df, text: bytes) -> None:
+    """写入工具结果，清理已过期条目，超出容量时淘汰最久未使用的条目"""
+    now = time.monotonic()
+    with _result_cache_lock:
+        for stale in [k for k, entry in _result_cache.items() if entry[0] <= now]:
+            del _result_cache[stale]
+        _result_cache[key] = (now + ttl, df, text)
+        _result_cache.move_to_end(key)
+        while len(_result_cache) > _RESULT_CACHE_SIZE:
+            _result_cache.popitem(last=False)
+
+
+def _call_data_tool(tool_name: str, arguments: dict) -> bytes:
+    """执行数据类工具，返回已转义为 JSON 字符串字面量的结果文本或错误提示 (bytes)"""
+    fn_name, required, defaults, label = _DATA_TOOLS[tool_name]
+    crypto_data = _data_module()
+    fn = getattr(crypto_data, fn_name)
+    kwargs = {key: arguments[key] for key in required}
+    for key, default in defaults.items():
+        kwargs[key] = arguments.get(key, default)
+
+    key = (tool_name, tuple(sorted(kwargs.items())))
+    try:
+        hit = _result_cache_get(key) if crypto_data.CACHE_ENABLED else None
+    except TypeError:  # 参数值不可哈希 (如列表)，不走缓存
+        key, hit = None, None
+
+    if hit is not None:
+        df, text = hit
+    else:
+        df = fn(**kwargs, use_proxy=False)
+        if df is None:
+            return _encode(f"Error: Failed to fetch {label}")
+        text = _encode(_df_to_json(df))
+        ttl = getattr(fn, "cache_ttl", 0)
+        ttl = ttl(kwargs) if callable(ttl) else ttl
+        if crypto_data.CACHE_ENABLED and key is not None and ttl > 0:
+            _result_cache_put(key, ttl, df, text)
+
+    if tool_name == "get_candles":
+        # ---- 存入缓存，供后续分析工具复用 ----
+        _candles_cache[(kwargs["inst_id"], kwargs["bar"])] = df
+    return text
+
+
+def _load_analysis(arguments: dict) -> "TechnicalAnalysis":
+    """构建分析对象：优先复用 get_candles 缓存的K线，否则从 API 获取"""
+    inst_id = arguments["inst_id"]
+    bar     = arguments.get("bar", "1D")
+    limit   = int(arguments.get("limit", 100))
+
+    TechnicalAnalysis = _analysis_module().TechnicalAnalysis
+    cached = _candles_cache.get((inst_id, bar))
+    if cached is not None:
+        ta = TechnicalAnalysis(kline_data=cached)
+        ta.inst_id = inst_id
+        ta.bar = bar
+    else:
+        ta = TechnicalAnalysis(inst_id=inst_id, bar=bar, limit=limit, use_proxy=False)
+    return ta
+
+
+def _tool_analysis_summary(ta: "TechnicalAnalysis", arguments: dict) -> str:
+    """get_analysis_summary：技术分析摘要"""
+    result = _analysis_module()._analyze_single_asset(ta, arguments["inst_id"])
+    if result is None:
+        return "Error: 分析失败，数据不足"
+    return _dumps(_clean_any(result))
+
+
+def _tool_all_indicators(ta: "TechnicalAnalysis", arguments: dict) -> str:
+    """get_all_indicators：完整指标序列 (最新 last_n 行)"""
+    last_n = int(arguments.get("last_n", 10))
+    df = ta.get_all_indicators()
+    if last_n > 0:
+        df = df.tail(last_n)
+    records = _clean_df_to_records(df)
+    return _dumps(records)
+
+
+def _tool_support_resistance(ta: "TechnicalAnalysis", arguments: dict) -> str:
+    """get_support_resistance：支撑/阻力位与斐波那契回撤"""
+    window = int(arguments.get("window", 5))
+    support, resistance = ta.find_support_resistance(window=window)
+    high_price  = float(ta.data['high'].max())  # type: ignore
+    low_price   = float(ta.data['low'].min())  # type: ignore
+    curr_price  = float(ta.data['close'].iloc[-1])  # type: ignore
+    fib         = ta.calculate_fibonacci_retracement(high_price, low_price)
+
+    result = {
+        "inst_id": ta.inst_id,
+        "bar": ta.bar,
+        "current_price":     _clean_value(curr_price),
+        "support_levels":    [_clean_value(v) for v in sorted(support,     reverse=True)],
+        "resistance_levels": [_clean_value(v) for v in sorted(resistance,  reverse=True)],
+        "fibonacci_retracement": {k: _clean_value(v) for k, v in fib.items()},
+        "price_range": {
+            "high": _clean_value(high_price),
+            "low":  _clean_value(low_price)
+        }
+    }
+    return _dumps(result)
+
+
+# 分析类工具：name -> 处理函数 (入参为已加载K线的分析对象)
+_ANALYSIS_TOOLS = {
+    "get_analysis_summary":   _tool_analysis_summary,
+    "get_all_indicators":     _tool_all_indicators,
+    "get_support_resistance": _tool_support_resistance,
+}
+
+
+def handle_tool_call(request_id: Any, params: dict) -> Tuple[bytes, ...]:
     """执行工具调用"""
     tool_name = params.get("name")
     arguments = params.get("arguments", {})
-    
+
     try:
-        if tool_name == "get_candles":
-            inst_id = arguments["inst_id"]
-            bar     = arguments.get("bar", "1H")
-            df = get_okx_candles(
-                inst_id=inst_id,
-                bar=bar,
-                limit=arguments.get("limit", 100),
-                use_proxy=False
-            )
-            if df is not None:
-                # 转换为 JSON 友好格式
-                result = df.to_dict(orient="records")
-                # 将 datetime 转为字符串
-                for row in result:
-                    row["datetime"] = str(row["datetime"])
-                # ---- 存入缓存，供后续分析工具复用 ----
-                _candles_cache[(inst_id, bar)] = result
-                content = json.dumps(result, indent=2)
-            else:
-                content = "Error: Failed to fetch candle data"
-                
-        elif tool_name == "get_funding_rate":
-            df = get_okx_funding_rate(
-                inst_id=arguments["inst_id"],
-                limit=arguments.get("limit", 100),
-                use_proxy=False
-            )
-            if df is not None:
-                result = df.to_dict(orient="records")
-                for row in result:
-                    row["datetime"] = str(row["datetime"])
-                content = json.dumps(result, indent=2)
-            else:
-                content = "Error: Failed to fetch funding rate data"
-                
-        elif tool_name == "get_open_interest":
-            df = get_okx_open_interest(
-                inst_id=arguments["inst_id"],
-                period=arguments.get("period", "1H"),
-                limit=arguments.get("limit", 100),
-                use_proxy=False
-            )
-            if df is not None:
-                result = df.to_dict(orient="records")
-                for row in result:
-                    row["datetime"] = str(row["datetime"])
-                content = json.dumps(result, indent=2)
-            else:
-                content = "Error: Failed to fetch open interest data"
-                
-        elif tool_name == "get_long_short_ratio":
-            df = get_long_short_ratio(
-                ccy=arguments["ccy"],
-                period=arguments.get("period", "1H"),
-                limit=arguments.get("limit", 100),
-                use_proxy=False
-            )
-            if df is not None:
-                result = df.to_dict(orient="records")
-                for row in result:
-                    row["datetime"] = str(row["datetime"])
-                content = json.dumps(result, indent=2)
-            else:
-                content = "Error: Failed to fetch long/short ratio data"
-                
-        elif tool_name == "get_liquidation":
-            df = get_okx_liquidation(
-                inst_id=arguments["inst_id"],
-                state=arguments.get("state", "filled"),
-                limit=arguments.get("limit", 100),
-                use_proxy=False
-            )
-            if df is not None:
-                result = df.to_dict(orient="records")
-                for row in result:
-                    row["datetime"] = str(row["datetime"])
-                content = json.dumps(result, indent=2)
-            else:
-                content = "Error: Failed to fetch liquidation data"
-                
-        elif tool_name == "get_top_trader_position_ratio":
-            df = get_top_trader_long_short_position_ratio(
-                inst_id=arguments["inst_id"],
-                period=arguments.get("period", "5m"),
-                limit=arguments.get("limit", 100),
-                use_proxy=False
-            )
-            if df is not None:
-                result = df.to_dict(orient="records")
-                for row in result:
-                    row["datetime"] = str(row["datetime"])
-                content = json.dumps(result, indent=2)
-            else:
-                content = "Error: Failed to fetch top trader position ratio data"
-                
-        elif tool_name == "get_option_oi_volume_ratio":
-            df = get_option_open_interest_volume_ratio(
-                ccy=arguments["ccy"],
-                period=arguments.get("period", "8H"),
-                use_proxy=False
-            )
-            if df is not None:
-                result = df.to_dict(orient="records")
-                for row in result:
-                    row["datetime"] = str(row["datetime"])
-                content = json.dumps(result, indent=2)
-            else:
-                content = "Error: Failed to fetch option OI/volume ratio data"
-                
-        elif tool_name == "get_fear_greed_index":
-            df = get_fear_greed_index(
-                days=arguments.get("days", 7),
-                use_proxy=False
-            )
-            if df is not None:
-                result = df.to_dict(orient="records")
-                content = json.dumps(result, indent=2)
-            else:
-                content = "Error: Failed to fetch fear and greed index data"
-                
-        elif tool_name == "get_analysis_summary":
-            inst_id = arguments["inst_id"]
-            bar     = arguments.get("bar", "1D")
-            limit   = int(arguments.get("limit", 100))
-
-            cached = _candles_cache.get((inst_id, bar))
-            if cached is not None:
-                ta = TechnicalAnalysis(kline_data=cached)
-                ta.inst_id = inst_id
-                ta.bar = bar
-            else:
-                ta = TechnicalAnalysis(inst_id=inst_id, bar=bar, limit=limit, use_proxy=False)
-            if ta.data.empty:  # type: ignore
-                content = f"Error: 无法获取 {inst_id} 的K线数据"
-            else:
-                result = _analyze_single_asset(ta, inst_id)
-                if result is None:
-                    content = "Error: 分析失败，数据不足"
+        if tool_name in _DATA_TOOLS:
+            text = _call_data_tool(tool_name, arguments)
+        else:
+            if tool_name in _ANALYSIS_TOOLS:
+                ta = _load_analysis(arguments)
+                if ta.data.empty:  # type: ignore
+                    content = f"Error: 无法获取 {arguments['inst_id']} 的K线数据"
                 else:
-                    content = json.dumps(_clean_any(result), indent=2, ensure_ascii=False)
-
-        elif tool_name == "get_all_indicators":
-            inst_id = arguments["inst_id"]
-            bar     = arguments.get("bar", "1D")
-            limit   = int(arguments.get("limit", 100))
-            last_n  = int(arguments.get("last_n", 10))
-
-            cached = _candles_cache.get((inst_id, bar))
-            if cached is not None:
-                ta = TechnicalAnalysis(kline_data=cached)
-                ta.inst_id = inst_id
-                ta.bar = bar
-            else:
-                ta = TechnicalAnalysis(inst_id=inst_id, bar=bar, limit=limit, use_proxy=False)
-            if ta.data.empty: # type: ignore
-                content = f"Error: 无法获取 {inst_id} 的K线数据"
-            else:
-                df = ta.get_all_indicators()
-                if last_n > 0:
-                    df = df.tail(last_n)
-                records = _clean_df_to_records(df)
-                content = json.dumps(records, indent=2, ensure_ascii=False)
-
-        elif tool_name == "get_support_resistance":
-            inst_id = arguments["inst_id"]
-            bar     = arguments.get("bar", "1D")
-            limit   = int(arguments.get("limit", 100))
-            window  = int(arguments.get("window", 5))
-
-            cached = _candles_cache.get((inst_id, bar))
-            if cached is not None:
-                ta = TechnicalAnalysis(kline_data=cached)
-                ta.inst_id = inst_id
-                ta.bar = bar
-            else:
-                ta = TechnicalAnalysis(inst_id=inst_id, bar=bar, limit=limit, use_proxy=False)
-            if ta.data.empty: # type: ignore
-                content = f"Error: 无法获取 {inst_id} 的K线数据"
+                    content = _ANALYSIS_TOOLS[tool_name](ta, arguments)
             else:
-                support, resistance = ta.find_support_resistance(window=window)
-                high_price  = float(ta.data['high'].max())  # type: ignore
-                low_price   = float(ta.data['low'].min())  # type: ignore
-                curr_price  = float(ta.data['close'].iloc[-1])  # type: ignore
-                fib         = ta.calculate_fibonacci_retracement(high_price, low_price)
-
-                result = {
-                    "inst_id": inst_id,
-                    "bar": bar,
-                    "current_price":     _clean_value(curr_price),
-                    "support_levels":    [_clean_value(v) for v in sorted(support,     reverse=True)],
-                    "resistance_levels": [_clean_value(v) for v in sorted(resistance,  reverse=True)],
-                    "fibonacci_retracement": {k: _clean_value(v) for k, v in fib.items()},
-                    "price_range": {
-                        "high": _clean_value(high_price),
-                        "low":  _clean_value(low_price)
-                    }
-                }
-                content = json.dumps(result, indent=2, ensure_ascii=False)
-
-        else:
-            content = f"Error: Unknown tool '{tool_name}'"
-            
-        return {
-            "jsonrpc": "2.0",
-            "id": request_id,
-            "result": {
-                "content": [
-                    {
-                        "type": "text",
-                        "text": content
-                    }
-                ]
-            }
-        }
+                content = f"Error: Unknown tool '{tool_name}'"
+            text = _encode(content)
+
+        return (
+            _TOOL_RESULT_HEAD, _encode(request_id),
+            _TOOL_RESULT_BODY, text,
+            _TOOL_RESULT_TAIL
+        )
         
     except Exception as e:
-        return {
-            "jsonrpc": "2.0",
-            "id": request_id,
-            "error": {
-                "code": -32603,
-                "message": str(e)
-            }
-        }
+        return _error_response(request_id, -32603, str(e))
+
+
+# 支持的 JSON-RPC 方法，哈希集合 O(1) 判定
+_KNOWN_METHODS = frozenset({"initialize", "notifications/initialized", "tools/list", "tools/call"})
+
+
+def handle_request(request: Any) -> Union[dict, Tuple[bytes, ...], None]:
+    """处理单条 JSON-RPC 请求，通知类消息返回 None (无需响应)"""
+    # 结构校验前置：非对象、缺少 method 或 params 非对象的消息直接返回错误，不进入分发
+    if not isinstance(request, dict) or not isinstance(request.get("method"), str):
+        request_id = request.get("id") if isinstance(request, dict) else None
+        return _error_response(request_id, -32600, "Invalid Request")
+
+    method = request["method"]
+    request_id = request.get("id")
+
+    if method not in _KNOWN_METHODS:
+        if "id" not in request:
+            return None  # 未知通知 (如 notifications/cancelled)：按规范不响应
+        return _error_response(request_id, -32601, f"Method not found: {method}")
+
+    params = request.get("params", {})
+    if not isinstance(params, dict):
+        return _error_response(request_id, -32602, "Invalid params")
+
+    if method == "initialize":
+        return handle_initialize(request_id)
+    if method == "notifications/initialized":
+        return None  # 无需响应
+    if method == "tools/list":
+        return handle_tools_list(request_id)
+    return handle_tool_call(request_id, params)
+
+
+def handle_batch(batch: list) -> Optional[Union[list, dict]]:
+    """
+    处理批量请求 (JSON-RPC 2.0 batch)：各请求并发执行，上游 HTTP 请求相互重叠，
+    结果按原顺序合并为一个数组响应；全部为通知时返回 None。
+    空数组按规范返回单个错误对象 (不包装为数组)。
+    """
+    if not batch:
+        return _error_response(None, -32600, "Invalid Request")
+    responses = [r for r in _EXECUTOR.map(handle_request, batch) if r is not None]
+    return responses or None
+
+
+def _handle_and_send(request: dict) -> None:
+    """在工作线程中处理单条请求并直接写出响应"""
+    try:
+        response = handle_request(request)
+    except Exception as e:
+        response = _error_response(request.get("id"), -32603, str(e))
+    if response is not None:
+        send_response(response)
 
 
 def main():
     """MCP Server 主循环"""
-    # 禁用 crypto_data 模块的 print 输出 (会干扰 JSON-RPC)
-    import io
-    import contextlib
-    
-    while True:
+    global _protocol_out
+
+    # 协议输出改走复制的 fd，fd 1 指向 /dev/null：屏蔽 crypto_data 模块的 print 输出 (会干扰 JSON-RPC)
+    _protocol_out = _take_over_stdout()
+
+    for line in _iter_stdin_lines():
         try:
-            line = sys.stdin.readline()
-            if not line:
-                break
-                
-            request = json.loads(line.strip())
-            method = request.get("method")
-            request_id = request.get("id")
-            params = request.get("params", {})
-            
-            if method == "initialize":
-                response = handle_initialize(request_id)
-            elif method == "notifications/initialized":
-                continue  # 无需响应
-            elif method == "tools/list":
-                response = handle_tools_list(request_id)
-            elif method == "tools/call":
-                # 静默执行，捕获 print 输出
-                with contextlib.redirect_stdout(io.StringIO()):
-                    with contextlib.redirect_stderr(io.StringIO()):
-                        response = handle_tool_call(request_id, params)
+            request = _loads(line)
+            if isinstance(request, dict) and request.get("method") == "tools/call":
+                # 工具调用彼此独立：提交线程池并发执行，完成即写出 (JSON-RPC 以 id 对应，允许乱序)，
+                # 主循环继续读取后续请求
+                _EXECUTOR.submit(_handle_and_send, request)
+                continue
+            if isinstance(request, list):
+                response = handle_batch(request)
             else:
-                response = {
-                    "jsonrpc": "2.0",
-                    "id": request_id,
-                    "error": {
-                        "code": -32601,
-                        "message": f"Method not found: {method}"
-                    }
-                }
-            
-            send_response(response)
-            
+                response = handle_request(request)
+
+            if response is not None:
+                send_response(response)
+
         except json.JSONDecodeError:
             continue
         except Exception as e:
-            error_response = {
-                "jsonrpc": "2.0",
-                "id": None,
-                "error": {
-                    "code": -32603,
-                    "message": str(e)
-                }
-            }
+            error_response = _error_response(None, -32603, str(e))
             send_response(error_response)
 
+    # stdin 关闭后等待尚未完成的工具调用写出响应再退出
+    _EXECUTOR.shutdown(wait=True)
+
 
 if __name__ == "__main__":
-    main()
\ No newline at end of file
+    main()
@@ -6,11 +6,28 @@
 数据接口: 使用 crypto_data.py 获取实时市场数据
 """
 
+import inspect
 import json
 import os
 import numpy as np
 import pandas as pd
+from numpy.lib.stride_tricks import sliding_window_view
+
+try:
+    from numba import njit
+except ImportError:  # 未安装 numba 时不编译内核，RSI/DMI/ATR/布林带走 pandas 向量化实现
+    njit = None
+try:
+    import bottleneck as bn
+except ImportError:  # 未安装 bottleneck 时滚动均值/标准差/最值走 pandas rolling
+    bn = None
+try:
+    import orjson
+except ImportError:  # 未安装 orjson 时结果文件用标准库 json 写出
+    orjson = None
+from concurrent.futures import ThreadPoolExecutor
 from datetime import datetime
+from functools import wraps
 from typing import Dict, List, Tuple, Optional, Union
 
 # 从 crypto_data 导入数据获取函数
@@ -23,6 +40,197 @@ from crypto_data import (
 )
 
 
+# ==================== Numba 内核 ====================
+# 单次遍历连续 float64 数组计算 RSI / DMI / ATR / 布林带，避免 pandas 逐步生成中间 Series。
+# 语义与 pandas 实现一致：滚动均值窗口内含 NaN 即为 NaN，除零按 IEEE 规则得到 inf/NaN
+# (error_model='numpy')。仅在 numba 可用时启用；纯 Python 下逐元素循环反而更慢。
+
+_HAS_NUMBA = njit is not None
+
+
+def _njit(func):
+    """numba 可用时以 nopython 模式编译 (结果缓存到磁盘)，否则原样返回"""
+    if njit is None:
+        return func
+    return njit(cache=True, error_model='numpy')(func)
+
+
+@_njit
+def _rolling_mean_kernel(x, period):
+    """简单滚动均值，等价于 Series.rolling(period).mean()"""
+    n = len(x)
+    out = np.full(n, np.nan)
+    for i in range(period - 1, n):
+        total = 0.0
+        valid = True
+        for j in range(i - period + 1, i + 1):
+            if np.isnan(x[j]):
+                valid = False
+                break
+            total += x[j]
+        if valid:
+            out[i] = total / period
+    return out
+
+
+@_njit
+def _true_range_kernel(high, low, close):
+    """真实波幅：max(高-低, |高-昨收|, |低-昨收|)，忽略 NaN 项 (全为 NaN 时为 NaN)"""
+    n = len(close)
+    tr = np.full(n, np.nan)
+    for i in range(n):
+        best = high[i] - low[i]
+        if i > 0:
+            for v in (abs(high[i] - close[i - 1]), abs(low[i] - close[i - 1])):
+                if np.isnan(best) or v > best:
+                    best = v
+        tr[i] = best
+    return tr
+
+
+@_njit
+def _rsi_kernel(delta, period):
+    """RSI：涨跌幅 (首根为 NaN) 拆分为上涨/下跌 (NaN 记 0)，各取滚动均值后计算"""
+    n = len(delta)
+    gain = np.zeros(n)
+    loss = np.zeros(n)
+    for i in range(n):
+        if delta[i] > 0:
+            gain[i] = delta[i]
+        elif delta[i] < 0:
+            loss[i] = -delta[i]
+    avg_gain = _rolling_mean_kernel(gain, period)
+    avg_loss = _rolling_mean_kernel(loss, period)
+    rsi = np.full(n, np.nan)
+    for i in range(n):
+        rs = avg_gain[i] / avg_loss[i]
+        rsi[i] = 100 - (100 / (1 + rs))
+    return rsi
+
+
+@_njit
+def _dmi_kernel(high, low, close, period):
+    """DMI：一次遍历得到 +DM/-DM 与真实波幅，返回 +DI, -DI, ADX"""
+    n = len(close)
+    plus_dm = np.full(n, np.nan)
+    minus_dm = np.full(n, np.nan)
+    for i in range(1, n):
+        up = high[i] - high[i - 1]
+        down = low[i - 1] - low[i]
+        # 与 pandas 实现相同的置零顺序 (NaN 参与的比较均为 False，保持 NaN)
+        if up < 0:
+            up = 0.0
+        if down < 0:
+            down = 0.0
+        if up <= down:
+            up = 0.0
+        if down <= up:
+            down = 0.0
+        plus_dm[i] = up
+        minus_dm[i] = down
+
+    atr = _rolling_mean_kernel(_true_range_kernel(high, low, close), period)
+    plus_avg = _rolling_mean_kernel(plus_dm, period)
+    minus_avg = _rolling_mean_kernel(minus_dm, period)
+    plus_di = np.full(n, np.nan)
+    minus_di = np.full(n, np.nan)
+    dx = np.full(n, np.nan)
+    for i in range(n):
+        plus_di[i] = 100 * plus_avg[i] / atr[i]
+        minus_di[i] = 100 * minus_avg[i] / atr[i]
+        dx[i] = 100 * abs(plus_di[i] - minus_di[i]) / (plus_di[i] + minus_di[i])
+    return plus_di, minus_di, _rolling_mean_kernel(dx, period)
+
+
+@_njit
+def _bollinger_kernel(x, period, std_dev):
+    """布林带：每个窗口一次求均值、再求样本标准差 (ddof=1)，返回上轨、中轨、下轨"""
+    n = len(x)
+    upper = np.full(n, np.nan)
+    middle = np.full(n, np.nan)
+    lower = np.full(n, np.nan)
+    for i in range(period - 1, n):
+        total = 0.0
+        valid = True
+        for j in range(i - period + 1, i + 1):
+            if np.isnan(x[j]):
+                valid = False
+                break
+            total += x[j]
+        if not valid:
+            continue
+        mean = total / period
+        middle[i] = mean
+        # 先求均值再累加离差平方，避免 E[x²]-mean² 的相消误差
+        sq = 0.0
+        for j in range(i - period + 1, i + 1):
+            sq += (x[j] - mean) ** 2
+        std = np.sqrt(sq / (period - 1))
+        upper[i] = mean + std * std_dev
+        lower[i] = mean - std * std_dev
+    return upper, middle, lower
+
+
+# ==================== 增量更新 ====================
+# update() 追加一根K线后只计算最后一行指标：EMA / MACD 信号线 / KDJ 平滑 / OBV 由上一行状态
+# 递推一步，滚动类指标只在末尾定长窗口上复用上面的内核，指标计算量与历史长度无关；
+# 追加K线本身仍需复制整个 DataFrame 与 OHLCV 数组 (O(N))，只是远比全量重算便宜。
+
+# 末尾窗口长度：覆盖最长的滚动窗口 MA50
+_TAIL_SIZE = 50
+
+
+def _step_ema(prev: float, x: float, alpha: float) -> float:
+    """EMA (adjust=False) 递推一步，按 pandas ewm 的加权式计算；尚无前值 (序列开头的 NaN) 时以当前值起算"""
+    if np.isnan(prev):
+        return x
+    old = 1.0 - alpha
+    return (old * prev + alpha * x) / (old + alpha)
+
+
+def _last_mean(x: np.ndarray, period: int) -> float:
+    """最后 period 个值的均值，不足或含 NaN 时为 NaN (即 rolling(period).mean() 的末项)"""
+    if len(x) < period:
+        return np.nan
+    return float(_rolling_mean_kernel(x[-period:], period)[-1])
+
+
+def _pct_change(x: np.ndarray, periods: int) -> np.ndarray:
+    """百分比变化 (x[t] / x[t-periods] - 1) * 100，前 periods 项为 NaN，等价于 pct_change(periods) * 100"""
+    out = np.full(len(x), np.nan, dtype=x.dtype)
+    if len(x) > periods:
+        with np.errstate(divide='ignore', invalid='ignore'):
+            out[periods:] = (x[periods:] / x[:-periods] - 1) * 100
+    return out
+
+
+
+def _memoized(*ignore: str):
+    """
+    指标结果按 (方法名, 参数) 缓存在实例的 _cache 上，同一份数据重复计算时直接返回；
+    ignore 中的参数 (如已算好的中间结果) 不参与缓存键。数据变化时由 _sync_arrays 清空。
+    返回的是缓存结果的副本，调用方原地修改不会污染缓存
+    """
+    def decorate(method):
+        signature = inspect.signature(method)
+
+        @wraps(method)
+        def wrapper(self, *args, **kwargs):
+            bound = signature.bind(self, *args, **kwargs)
+            bound.apply_defaults()
+            key = (method.__name__,) + tuple(
+                value for name, value in bound.arguments.items() if name != 'self' and name not in ignore
+            )
+            if key not in self._cache:
+                self._cache[key] = method(self, *args, **kwargs)
+            result = self._cache[key]
+            if isinstance(result, tuple):
+                return tuple(item.copy() for item in result)
+            return result.copy()
+        return wrapper
+    return decorate
+
+
 class TechnicalAnalysis:
     """技术分析类 - 统一入口
     
@@ -31,26 +239,31 @@ class TechnicalAnalysis:
     2. 通过API实时获取数据 (推荐)
     """
     
-    def __init__(self, kline_data: Optional[List[Dict]] = None, 
+    def __init__(self, kline_data: Optional[Union[List[Dict], pd.DataFrame]] = None, 
                  inst_id: Optional[str] = None,
                  bar: str = '1D',
                  limit: int = 100,
-                 use_proxy: bool = False):
+                 use_proxy: bool = False,
+                 dtype: type = np.float64):
         """
         初始化
         
         Args:
-            kline_data: 直接传入K线数据列表 (与inst_id二选一)
+            kline_data: 直接传入K线数据列表或 DataFrame (与inst_id二选一)
             inst_id: 交易对代码，如 'BTC-USDT' (与kline_data二选一)
             bar: K线周期，如 '1m', '5m', '15m', '30m', '1H', '4H', '1D', '1W'
             limit: 获取数据条数
             use_proxy: 是否使用代理
+            dtype: OHLCV 数值精度，默认 float64；np.float32 可减半内存带宽，但均线/RSI 等结果
+                   只保留约 7 位有效数字，持平判断 (DMI、支撑阻力) 也可能因舍入改变
         """
         self.inst_id = inst_id
         self.bar = bar
         self.limit = limit
         self.use_proxy = use_proxy
+        self.dtype = np.dtype(dtype)
         self.data = pd.DataFrame()
+        self._state: Optional[Dict] = None
 
         # 情况1: 直接传入数据
         if kline_data is not None:
@@ -64,23 +277,68 @@ class TechnicalAnalysis:
                 print(f"错误: 无法获取 {inst_id} 的数据")
                 self.data = pd.DataFrame()
             else:
+                self._ensure_dtype()
                 print(f"成功获取 {len(self.data)} 条K线数据")
         else:
             print("错误: 必须提供 kline_data 或 inst_id 之一")
 
+        self._sync_arrays()
+
 
     def _process_dataframe(self):
         """处理DataFrame，确保数据格式正确"""
         if self.data is not None and not self.data.empty:
-            self.data['datetime'] = pd.to_datetime(self.data['datetime'])
-            self.data = self.data.sort_values('datetime').reset_index(drop=True)
+            self.data['datetime'] = self._parse_datetime(self.data['datetime'])
+            self._sort_by_datetime()
             # 确保数值列为float类型
             for col in ['open', 'high', 'low', 'close', 'vol']:
                 if col in self.data.columns:
                     self.data[col] = pd.to_numeric(self.data[col], errors='coerce')
+            self._ensure_dtype()
+
+    def _sort_by_datetime(self):
+        """按时间升序排列并重建索引；OKX K线通常已按时间排好，已单调递增时跳过排序"""
+        if not self.data['datetime'].is_monotonic_increasing: # type: ignore
+            self.data = self.data.sort_values('datetime') # type: ignore
+        self.data = self.data.reset_index(drop=True) # type: ignore
+
+    @staticmethod
+    def _parse_datetime(values: pd.Series) -> pd.Series:
+        """
+        解析 datetime 列：已是 datetime64 时直接返回，字符串优先按 ISO8601 解析 (免逐元素推断格式)，
+        不符合 ISO8601 (如毫秒时间戳整数) 时退回 pandas 自动推断
+        """
+        if pd.api.types.is_datetime64_any_dtype(values):
+            return values
+        try:
+            return pd.to_datetime(values, format='ISO8601')
+        except (ValueError, TypeError):
+            return pd.to_datetime(values)
+
+    def _ensure_dtype(self):
+        """OHLCV 列统一为 self.dtype：传入的 kline_data 可能是任意数值类型，默认按双精度计算"""
+        for col in ['open', 'high', 'low', 'close', 'vol']:
+            if col in self.data.columns and self.data[col].dtype != self.dtype:
+                self.data[col] = self.data[col].astype(self.dtype)
+
+    def _sync_arrays(self):
+        """
+        将 OHLCV 各列取出为连续 self.dtype 数组 (self._open / _high / _low / _close / _vol)，
+        数值计算直接读数组，DataFrame 仅用于对外输出；缺列或无数据时为空数组。
+        数据已变化，同时清空指标缓存
+        """
+        for col in ['open', 'high', 'low', 'close', 'vol']:
+            if col in self.data.columns: # type: ignore
+                arr = np.ascontiguousarray(self.data[col].to_numpy(dtype=self.dtype)) # type: ignore
+            else:
+                arr = np.empty(0, dtype=self.dtype)
+            setattr(self, '_' + col, arr)
+        self._index = self.data.index # type: ignore
+        self._cache: Dict[tuple, object] = {}
     
     @classmethod
-    def from_api(cls, inst_id: str, bar: str = '1D', limit: int = 100, use_proxy: bool = False):
+    def from_api(cls, inst_id: str, bar: str = '1D', limit: int = 100, use_proxy: bool = False,
+                 dtype: type = np.float64):
         """
         类方法: 从API创建TechnicalAnalysis实例 (推荐方式)
         
@@ -89,11 +347,12 @@ class TechnicalAnalysis:
             bar: K线周期
             limit: 数据条数
             use_proxy: 是否使用代理
+            dtype: OHLCV 数值精度 (默认 float64)
             
         Returns:
             TechnicalAnalysis实例
         """
-        return cls(inst_id=inst_id, bar=bar, limit=limit, use_proxy=use_proxy)
+        return cls(inst_id=inst_id, bar=bar, limit=limit, use_proxy=use_proxy, dtype=dtype)
     
     @staticmethod
     def fetch_kline_data(inst_id: str, bar: str = '1D', limit: int = 100, use_proxy: bool = False) -> Optional[pd.DataFrame]:
@@ -174,47 +433,82 @@ class TechnicalAnalysis:
         """
         return get_okx_liquidation(inst_id, state=state, limit=limit, use_proxy=use_proxy)
     
+    def _sma(self, values: np.ndarray, period: int) -> pd.Series:
+        """
+        滚动均值 (窗口内不足 period 个有效值为 NaN)，有 bottleneck 时用 move_mean；
+        move_mean 要求窗口不超过序列长度，数据不足一个窗口时走 pandas (结果整列为 NaN)
+        """
+        if bn is not None and period <= len(values):
+            return pd.Series(bn.move_mean(values, period, min_count=period), index=self._index)
+        return pd.Series(values, index=self._index).rolling(window=period).mean()
+
     # ==================== 趋势指标 ====================
     
+    @_memoized()
     def calculate_ma(self, period: int) -> pd.Series:
         """计算简单移动平均线"""
-        return self.data['close'].rolling(window=period).mean() # type: ignore
+        return self._sma(self._close, period)
     
+    @_memoized()
     def calculate_ema(self, period: int) -> pd.Series:
         """计算指数移动平均线"""
         return self.data['close'].ewm(span=period, adjust=False).mean() # type: ignore
     
+    @_memoized()
     def calculate_dmi(self, period: int = 14) -> Tuple[pd.Series, pd.Series, pd.Series]:
         """计算DMI指标，返回+DI, -DI, ADX"""
-        high = self.data['high'] # type: ignore
-        low = self.data['low'] # type: ignore
-        close = self.data['close'] # type: ignore
-        
-        plus_dm = high.diff()
-        minus_dm = -low.diff()
+        if _HAS_NUMBA:
+            plus_di, minus_di, adx = _dmi_kernel(
+                self._high, self._low, self._close, period
+            )
+            index = self._index
+            return pd.Series(plus_di, index=index), pd.Series(minus_di, index=index), pd.Series(adx, index=index)
+
+        # 在 ndarray 上计算 +DM/-DM 与 DI/DX (首根差分为 NaN，NaN 参与的比较为 False 保持 NaN)
+        plus_dm = np.empty_like(self._high)
+        minus_dm = np.empty_like(self._low)
+        plus_dm[:1] = np.nan
+        minus_dm[:1] = np.nan
+        np.subtract(self._high[1:], self._high[:-1], out=plus_dm[1:])
+        np.subtract(self._low[:-1], self._low[1:], out=minus_dm[1:])
         plus_dm[plus_dm < 0] = 0
         minus_dm[minus_dm < 0] = 0
         plus_dm[plus_dm <= minus_dm] = 0
         minus_dm[minus_dm <= plus_dm] = 0
         
-        tr1 = high - low
-        tr2 = abs(high - close.shift())
-        tr3 = abs(low - close.shift())
-        tr = pd.concat([tr1, tr2, tr3], axis=1).max(axis=1)
-        atr = tr.rolling(window=period).mean()
+        atr = self._sma(self._true_range().to_numpy(), period).to_numpy()
         
-        plus_di = 100 * plus_dm.rolling(window=period).mean() / atr
-        minus_di = 100 * minus_dm.rolling(window=period).mean() / atr
-        dx = 100 * abs(plus_di - minus_di) / (plus_di + minus_di)
-        adx = dx.rolling(window=period).mean()
+        with np.errstate(divide='ignore', invalid='ignore'):
+            plus_di = 100 * self._sma(plus_dm, period).to_numpy() / atr
+            minus_di = 100 * self._sma(minus_dm, period).to_numpy() / atr
+            dx = 100 * np.abs(plus_di - minus_di) / (plus_di + minus_di)
+        adx = self._sma(dx, period)
         
-        return plus_di, minus_di, adx
+        index = self._index
+        return pd.Series(plus_di, index=index), pd.Series(minus_di, index=index), adx
     
     # ==================== 动量指标 ====================
     
-    def calculate_rsi(self, period: int = 14) -> pd.Series:
-        """计算RSI指标"""
-        delta = self.data['close'].diff() # type: ignore
+    def _close_delta(self) -> np.ndarray:
+        """收盘价逐根差分，首项为 NaN (等价于 close.diff())"""
+        delta = np.empty_like(self._close)
+        delta[:1] = np.nan
+        np.subtract(self._close[1:], self._close[:-1], out=delta[1:])
+        return delta
+
+    @_memoized('delta')
+    def calculate_rsi(self, period: int = 14, delta: Optional[np.ndarray] = None) -> pd.Series:
+        """
+        计算RSI指标
+
+        delta: 已算好的收盘价差分 (见 _close_delta)，多个周期共用时传入以免重复计算
+        """
+        if delta is None:
+            delta = self._close_delta()
+        if _HAS_NUMBA:
+            return pd.Series(_rsi_kernel(delta, period), index=self._index)
+
+        delta = pd.Series(delta, index=self._index)
         gain = delta.where(delta > 0, 0)
         loss = -delta.where(delta < 0, 0)
         avg_gain = gain.rolling(window=period).mean()
@@ -223,58 +517,102 @@ class TechnicalAnalysis:
         rsi = 100 - (100 / (1 + rs))
         return rsi
     
-    def calculate_macd(self, fast: int = 12, slow: int = 26, signal: int = 9) -> Tuple[pd.Series, pd.Series, pd.Series]:
-        """计算MACD指标，返回DIF, DEA, MACD柱"""
-        exp1 = self.data['close'].ewm(span=fast, adjust=False).mean() # type: ignore
-        exp2 = self.data['close'].ewm(span=slow, adjust=False).mean() # type: ignore
+    @_memoized('ema_fast', 'ema_slow')
+    def calculate_macd(self, fast: int = 12, slow: int = 26, signal: int = 9,
+                       ema_fast: Optional[pd.Series] = None,
+                       ema_slow: Optional[pd.Series] = None) -> Tuple[pd.Series, pd.Series, pd.Series]:
+        """
+        计算MACD指标，返回DIF, DEA, MACD柱
+
+        ema_fast / ema_slow: 已算好的快、慢线 EMA (周期须与 fast / slow 一致)，传入时直接复用
+        """
+        exp1 = ema_fast if ema_fast is not None else self.calculate_ema(fast)
+        exp2 = ema_slow if ema_slow is not None else self.calculate_ema(slow)
         dif = exp1 - exp2
         dea = dif.ewm(span=signal, adjust=False).mean()
         histogram = (dif - dea) * 2
         return dif, dea, histogram
     
+    @_memoized()
     def calculate_kdj(self, n: int = 9, m1: int = 3, m2: int = 3) -> Tuple[pd.Series, pd.Series, pd.Series]:
         """计算KDJ指标，返回K, D, J"""
-        low_list = self.data['low'].rolling(window=n, min_periods=n).min() # type: ignore
-        high_list = self.data['high'].rolling(window=n, min_periods=n).max() # type: ignore
-        rsv = (self.data['close'] - low_list) / (high_list - low_list) * 100 # type: ignore
-        k = rsv.ewm(com=m1-1, adjust=False).mean()
+        # move_min/move_max 要求窗口不超过序列长度，数据不足时走 pandas (整列为 NaN)
+        if bn is not None and n <= len(self._low):
+            low_list = bn.move_min(self._low, n, min_count=n)
+            high_list = bn.move_max(self._high, n, min_count=n)
+        else:
+            low_list = self.data['low'].rolling(window=n, min_periods=n).min().to_numpy() # type: ignore
+            high_list = self.data['high'].rolling(window=n, min_periods=n).max().to_numpy() # type: ignore
+
+        # 在 ndarray 上原地完成 相减/相除/放大；最高=最低时按 IEEE 得到 NaN/inf，与原实现一致
+        rsv = self._close - low_list
+        with np.errstate(divide='ignore', invalid='ignore'):
+            np.divide(rsv, high_list - low_list, out=rsv)
+        rsv *= 100
+
+        k = pd.Series(rsv, index=self._index).ewm(com=m1-1, adjust=False).mean()
         d = k.ewm(com=m2-1, adjust=False).mean()
         j = 3 * k - 2 * d
         return k, d, j
     
     # ==================== 波动率指标 ====================
     
+    @_memoized()
     def calculate_bollinger_bands(self, period: int = 20, std_dev: int = 2) -> Tuple[pd.Series, pd.Series, pd.Series]:
         """计算布林带，返回上轨、中轨、下轨"""
-        middle = self.data['close'].rolling(window=period).mean() # type: ignore
-        std = self.data['close'].rolling(window=period).std() # type: ignore
+        if _HAS_NUMBA:
+            upper, middle, lower = _bollinger_kernel(self._close, period, std_dev)
+            index = self._index
+            return pd.Series(upper, index=index), pd.Series(middle, index=index), pd.Series(lower, index=index)
+
+        middle = self._sma(self._close, period)
+        if bn is not None and period <= len(self._close):
+            std = pd.Series(bn.move_std(self._close, period, min_count=period, ddof=1), index=self._index)
+        else:
+            std = pd.Series(self._close, index=self._index).rolling(window=period).std()
         upper = middle + (std * std_dev)
         lower = middle - (std * std_dev)
         return upper, middle, lower
     
+    @_memoized()
     def calculate_atr(self, period: int = 14) -> pd.Series:
         """计算ATR（平均真实波幅）"""
-        high_low = self.data['high'] - self.data['low'] # type: ignore
-        high_close = abs(self.data['high'] - self.data['close'].shift()) # type: ignore
-        low_close = abs(self.data['low'] - self.data['close'].shift()) # type: ignore
-        ranges = pd.concat([high_low, high_close, low_close], axis=1)
-        true_range = ranges.max(axis=1)
-        return true_range.rolling(window=period).mean()
+        if _HAS_NUMBA:
+            tr = _true_range_kernel(self._high, self._low, self._close)
+            return pd.Series(_rolling_mean_kernel(tr, period), index=self._index)
+
+        return self._sma(self._true_range().to_numpy(), period)
+
+    def _true_range(self) -> pd.Series:
+        """
+        真实波幅 max(高-低, |高-昨收|, |低-昨收|)，直接在 ndarray 上逐元素取最大，
+        不再为行方向 max 拼接三列 DataFrame；fmax 忽略 NaN 项，与 DataFrame.max(axis=1) 一致
+        """
+        high = self._high
+        low = self._low
+        prev_close = np.roll(self._close, 1)
+        if len(prev_close):
+            prev_close[0] = np.nan
+        tr = np.fmax.reduce([high - low, np.abs(high - prev_close), np.abs(low - prev_close)])
+        return pd.Series(tr, index=self._index)
     
     # ==================== 成交量指标 ====================
     
+    @_memoized()
     def calculate_obv(self) -> pd.Series:
         """计算OBV（能量潮）"""
-        obv = pd.Series(index=self.data.index, dtype=float) # type: ignore
-        obv.iloc[0] = self.data['vol'].iloc[0] # type: ignore
-        for i in range(1, len(self.data)): # type: ignore
-            if self.data['close'].iloc[i] > self.data['close'].iloc[i-1]: # type: ignore
-                obv.iloc[i] = obv.iloc[i-1] + self.data['vol'].iloc[i] # type: ignore
-            elif self.data['close'].iloc[i] < self.data['close'].iloc[i-1]: # type: ignore
-                obv.iloc[i] = obv.iloc[i-1] - self.data['vol'].iloc[i] # type: ignore
-            else:
-                obv.iloc[i] = obv.iloc[i-1]
-        return obv
+        close = self._close
+        vol = self._vol
+        if len(close) == 0:
+            return pd.Series(index=self._index, dtype=float)
+
+        # 上涨加量、下跌减量、持平 (含 NaN 比较) 不变；首项为首根成交量，
+        # 一次 cumsum 与逐根累加的求和顺序一致
+        direction = np.sign(np.diff(close))
+        steps = np.empty_like(vol)
+        steps[0] = vol[0]
+        steps[1:] = np.where(direction > 0, vol[1:], np.where(direction < 0, -vol[1:], 0.0))
+        return pd.Series(np.cumsum(steps), index=self._index)
     
     # ==================== 价格结构指标 ====================
     
@@ -293,21 +631,22 @@ class TechnicalAnalysis:
     
     def find_support_resistance(self, window: int = 5) -> Tuple[List[float], List[float]]:
         """寻找支撑阻力位"""
-        highs = self.data['high'] # type: ignore
-        lows = self.data['low'] # type: ignore
-        
-        resistance_levels = []
-        for i in range(window, len(highs) - window):
-            if all(highs.iloc[i] >= highs.iloc[i-j] for j in range(1, window+1)) and \
-               all(highs.iloc[i] >= highs.iloc[i+j] for j in range(1, window+1)):
-                resistance_levels.append(highs.iloc[i])
-        
-        support_levels = []
-        for i in range(window, len(lows) - window):
-            if all(lows.iloc[i] <= lows.iloc[i-j] for j in range(1, window+1)) and \
-               all(lows.iloc[i] <= lows.iloc[i+j] for j in range(1, window+1)):
-                support_levels.append(lows.iloc[i])
-        
+        highs = self._high
+        lows = self._low
+
+        # 数据不足一个完整窗口 (左右各 window 根) 时没有可判定的极值点
+        size = 2 * window + 1
+        if len(highs) < size:
+            return [], []
+
+        # 一次取出所有 (2*window+1) 窗口：中心点等于窗口最大值即不低于左右各 window 根，
+        # 窗口内含 NaN 时最值为 NaN、比较为 False，与逐点比较一致
+        centers = slice(window, len(highs) - window)
+        is_resistance = highs[centers] == sliding_window_view(highs, size).max(axis=1)
+        is_support = lows[centers] == sliding_window_view(lows, size).min(axis=1)
+
+        resistance_levels = highs[centers][is_resistance].tolist()
+        support_levels = lows[centers][is_support].tolist()
         return support_levels, resistance_levels
     
     def get_all_indicators(self) -> pd.DataFrame:
@@ -315,11 +654,6 @@ class TechnicalAnalysis:
         if self.data.empty: # type: ignore
             return pd.DataFrame()
         
-        close = self.data['close'] # type: ignore
-        high = self.data['high'] # type: ignore
-        low = self.data['low'] # type: ignore
-        volume = self.data['vol'] # type: ignore
-        
         # 创建新的DataFrame存储指标
         indicators = pd.DataFrame(index=self.data.index) # type: ignore
         indicators['datetime'] = self.data['datetime'] # type: ignore
@@ -331,60 +665,218 @@ class TechnicalAnalysis:
         indicators['close'] = self.data['close'] # type: ignore
         indicators['volume'] = self.data['vol'] # type: ignore
 
+        # 数据不足一个窗口的滚动类指标整列为 NaN，直接填充，不再计算
+        # (EMA / MACD 从首根起即有值，始终计算)
+        n = len(self.data) # type: ignore
+        missing = np.full(n, np.nan)
+
         # 趋势指标 - 移动平均线
-        indicators['ma5'] = self.calculate_ma(5)
-        indicators['ma10'] = self.calculate_ma(10)
-        indicators['ma20'] = self.calculate_ma(20)
-        indicators['ma50'] = self.calculate_ma(50)
+        indicators['ma5'] = self.calculate_ma(5) if n >= 5 else missing
+        indicators['ma10'] = self.calculate_ma(10) if n >= 10 else missing
+        indicators['ma20'] = self.calculate_ma(20) if n >= 20 else missing
+        indicators['ma50'] = self.calculate_ma(50) if n >= 50 else missing
         indicators['ema12'] = self.calculate_ema(12)
         indicators['ema26'] = self.calculate_ema(26)
         
-        # 动量指标 - RSI
-        indicators['rsi14'] = self.calculate_rsi(14)
-        indicators['rsi6'] = self.calculate_rsi(6)
+        # 动量指标 - RSI (两个周期共用一次收盘价差分)
+        delta = self._close_delta()
+        indicators['rsi14'] = self.calculate_rsi(14, delta=delta) if n >= 14 else missing
+        indicators['rsi6'] = self.calculate_rsi(6, delta=delta) if n >= 6 else missing
         
-        # 动量指标 - MACD
-        dif, dea, macd_hist = self.calculate_macd()
+        # 动量指标 - MACD (复用上面的 EMA12 / EMA26)
+        dif, dea, macd_hist = self.calculate_macd(
+            ema_fast=indicators['ema12'], ema_slow=indicators['ema26']
+        )
         indicators['macd_dif'] = dif
         indicators['macd_dea'] = dea
         indicators['macd_hist'] = macd_hist
         
         # 动量指标 - KDJ
-        k, d, j = self.calculate_kdj()
+        k, d, j = self.calculate_kdj() if n >= 9 else (missing, missing, missing)
         indicators['kdj_k'] = k
         indicators['kdj_d'] = d
         indicators['kdj_j'] = j
         
-        # 趋势强度 - DMI
-        plus_di, minus_di, adx = self.calculate_dmi()
+        # 趋势强度 - DMI (首根无 ±DM，需 period+1 根)
+        plus_di, minus_di, adx = self.calculate_dmi() if n > 14 else (missing, missing, missing)
         indicators['dmi_plus_di'] = plus_di
         indicators['dmi_minus_di'] = minus_di
         indicators['dmi_adx'] = adx
         
         # 波动率指标 - 布林带
-        bb_upper, bb_middle, bb_lower = self.calculate_bollinger_bands()
+        bb_upper, bb_middle, bb_lower = self.calculate_bollinger_bands() if n >= 20 else (missing, missing, missing)
         indicators['bb_upper'] = bb_upper
         indicators['bb_middle'] = bb_middle
         indicators['bb_lower'] = bb_lower
         indicators['bb_width'] = (bb_upper - bb_lower) / bb_middle
         
         # 波动率指标 - ATR
-        indicators['atr14'] = self.calculate_atr(14)
+        indicators['atr14'] = self.calculate_atr(14) if n >= 14 else missing
         
         # 成交量指标 - OBV
         indicators['obv'] = self.calculate_obv()
         
-        # 价格变化百分比
-        indicators['price_change_1'] = close.pct_change(periods=1) * 100
-        indicators['price_change_5'] = close.pct_change(periods=5) * 100
-        indicators['price_change_20'] = close.pct_change(periods=20) * 100
+        # 价格变化百分比 (直接在收盘价数组上错位相除)
+        indicators['price_change_1'] = _pct_change(self._close, 1)
+        indicators['price_change_5'] = _pct_change(self._close, 5)
+        indicators['price_change_20'] = _pct_change(self._close, 20)
         
         # 成交量变化
-        indicators['volume_change'] = volume.pct_change() * 100
-        indicators['volume_sma20'] = volume.rolling(window=20).mean()
+        indicators['volume_change'] = _pct_change(self._vol, 1)
+        indicators['volume_sma20'] = self._sma(self._vol, 20) if n >= 20 else missing
+
+        last = indicators.iloc[-1]
+        self._state = {
+            'length': len(self.data), # type: ignore
+            'ema12': float(last['ema12']),
+            'ema26': float(last['ema26']),
+            'macd_dea': float(last['macd_dea']),
+            'kdj_k': float(last['kdj_k']),
+            'kdj_d': float(last['kdj_d']),
+            'rsv': self._last_rsv(),
+            'obv': float(last['obv']),
+        }
         
         return indicators
 
+    # ==================== 增量更新 ====================
+
+    def _last_rsv(self, n: int = 9) -> float:
+        """最后一根K线的 KDJ RSV (窗口不足或含 NaN 时为 NaN)"""
+        if len(self._close) < n:
+            return np.nan
+        lows = self._low[-n:]
+        highs = self._high[-n:]
+        if np.isnan(lows).any() or np.isnan(highs).any():
+            return np.nan
+        with np.errstate(divide='ignore', invalid='ignore'):
+            return float((self._close[-1] - lows.min()) / (highs.max() - lows.min()) * 100)
+
+    def update(self, row: Dict) -> pd.Series:
+        """
+        追加一根最新K线，返回该K线的指标行 (字段与 get_all_indicators 的一行相同)
+
+        基于上一次 get_all_indicators / update 留下的状态只计算最后一行，指标计算量与历史长度无关；
+        追加K线时 self.data 与 OHLCV 数组仍会整体复制 (O(N))。
+        没有状态、新K线不是最新一根，或上一根/新一根含 NaN (pandas 对缺口另有加权规则) 时，
+        退回全量计算 get_all_indicators().iloc[-1]
+
+        Args:
+            row: K线字典，字段与 kline_data 相同 (datetime, open, high, low, close, vol)
+        """
+        new = pd.DataFrame([row])
+        new['datetime'] = self._parse_datetime(new['datetime'])
+        for col in ['open', 'high', 'low', 'close', 'vol']:
+            if col in new.columns:
+                new[col] = pd.to_numeric(new[col], errors='coerce').astype(self.dtype)
+
+        state = self._state
+        incremental = (
+            state is not None
+            and state['length'] == len(self.data) # type: ignore
+            and new['datetime'].iloc[0] >= self.data['datetime'].iloc[-1] # type: ignore
+            and np.isfinite([self._high[-1], self._low[-1], self._close[-1], self._vol[-1]]).all()
+        )
+
+        self.data = pd.concat([self.data, new], ignore_index=True)
+        if not incremental:
+            self._sort_by_datetime()
+        self._sync_arrays()
+
+        if not (incremental and np.isfinite([self._high[-1], self._low[-1], self._close[-1], self._vol[-1]]).all()):
+            return self.get_all_indicators().iloc[-1]
+
+        # KDJ：RSV 出现 NaN/inf 后 pandas 按缺口加权，此时不递推
+        rsv = self._last_rsv()
+        if not np.isnan(state['kdj_k']) and not (np.isfinite(rsv) and np.isfinite(state['rsv'])): # type: ignore
+            return self.get_all_indicators().iloc[-1]
+
+        # 滚动类指标只依赖末尾窗口
+        c, h, l, v = (arr[-_TAIL_SIZE:] for arr in (self._close, self._high, self._low, self._vol))
+
+        close = float(c[-1])
+        ema12 = _step_ema(state['ema12'], close, 2 / (12 + 1)) # type: ignore
+        ema26 = _step_ema(state['ema26'], close, 2 / (26 + 1)) # type: ignore
+        dif = ema12 - ema26
+        dea = _step_ema(state['macd_dea'], dif, 2 / (9 + 1)) # type: ignore
+        k = _step_ema(state['kdj_k'], rsv, 1 / 3) # type: ignore
+        d = _step_ema(state['kdj_d'], k, 1 / 3) # type: ignore
+
+        if len(self._close) == 1:
+            obv = float(v[-1])
+        else:
+            step = np.sign(c[-1] - c[-2])
+            obv = state['obv'] + (float(v[-1]) if step > 0 else -float(v[-1]) if step < 0 else 0.0) # type: ignore
+
+        def rsi(period: int) -> float:
+            window = c[-(period + 1):]
+            delta = np.empty(len(window))
+            delta[:1] = np.nan
+            np.subtract(window[1:], window[:-1], out=delta[1:])
+            with np.errstate(divide='ignore', invalid='ignore'):
+                return float(_rsi_kernel(delta, period)[-1])
+
+        def pct(x: np.ndarray, periods: int) -> float:
+            return float(_pct_change(x[-(periods + 1):], periods)[-1])
+
+        # 各内核只取所需的最短窗口：ADX 需 2×14 根，ATR 需 14+1 根 (首根缺昨收)，布林带 20 根
+        # 未安装 numba 时内核为纯 Python，除零需与其他调用处一样静默 (得到 inf/NaN)
+        with np.errstate(divide='ignore', invalid='ignore'):
+            plus_di, minus_di, adx = _dmi_kernel(h[-28:], l[-28:], c[-28:], 14)
+            bb_upper, bb_middle, bb_lower = _bollinger_kernel(c[-20:], 20, 2)
+            atr = _rolling_mean_kernel(_true_range_kernel(h[-15:], l[-15:], c[-15:]), 14)
+            bb_width = (bb_upper[-1] - bb_lower[-1]) / bb_middle[-1]
+
+        last = self.data.iloc[-1] # type: ignore
+        values = {
+            'datetime': last['datetime'],
+            'open': last['open'],
+            'high': last['high'],
+            'low': last['low'],
+            'close': last['close'],
+            'volume': last['vol'],
+            'ma5': _last_mean(c, 5),
+            'ma10': _last_mean(c, 10),
+            'ma20': _last_mean(c, 20),
+            'ma50': _last_mean(c, 50),
+            'ema12': ema12,
+            'ema26': ema26,
+            'rsi14': rsi(14),
+            'rsi6': rsi(6),
+            'macd_dif': dif,
+            'macd_dea': dea,
+            'macd_hist': (dif - dea) * 2,
+            'kdj_k': k,
+            'kdj_d': d,
+            'kdj_j': 3 * k - 2 * d,
+            'dmi_plus_di': float(plus_di[-1]),
+            'dmi_minus_di': float(minus_di[-1]),
+            'dmi_adx': float(adx[-1]),
+            'bb_upper': float(bb_upper[-1]),
+            'bb_middle': float(bb_middle[-1]),
+            'bb_lower': float(bb_lower[-1]),
+            'bb_width': float(bb_width),
+            'atr14': float(atr[-1]),
+            'obv': obv,
+            'price_change_1': pct(c, 1),
+            'price_change_5': pct(c, 5),
+            'price_change_20': pct(c, 20),
+            'volume_change': pct(v, 1),
+            'volume_sma20': _last_mean(v, 20),
+        }
+
+        self._state = {
+            'length': len(self.data), # type: ignore
+            'ema12': ema12,
+            'ema26': ema26,
+            'macd_dea': dea,
+            'kdj_k': k,
+            'kdj_d': d,
+            'rsv': rsv,
+            'obv': obv,
+        }
+        return pd.Series(values, name=self.data.index[-1]) # type: ignore
+
 
 def analyze_all_assets(data_file: Optional[str] = None, 
                        inst_ids: Optional[List[str]] = None,
@@ -433,20 +925,23 @@ def analyze_all_assets(data_file: Optional[str] = None,
     
     # 方式2: 直接从API获取
     elif inst_ids:
-        for inst_id in inst_ids:
-            print(f"\n{'='*40}\n分析 {inst_id}\n{'='*40}")
-            
-            # 从API获取数据
-            ta = TechnicalAnalysis.from_api(inst_id, bar=bar, limit=limit, use_proxy=use_proxy)
-            
-            if ta.data.empty: # type: ignore
-                print(f"  ✗ {inst_id} 数据获取失败，跳过")
-                continue
-            
-            result = _analyze_single_asset(ta, inst_id)
-            if result:
-                results[inst_id] = result
-                print(f"  ✓ {inst_id} 分析完成")
+        # 各资产的K线请求互不依赖且以网络等待为主，用线程池并发获取；
+        # 指标计算耗时仅毫秒级，按输入顺序在当前线程逐个完成 (map 按提交顺序返回)
+        def fetch(inst_id: str) -> 'TechnicalAnalysis':
+            return TechnicalAnalysis.from_api(inst_id, bar=bar, limit=limit, use_proxy=use_proxy)
+
+        with ThreadPoolExecutor(max_workers=min(8, len(inst_ids))) as executor:
+            for inst_id, ta in zip(inst_ids, executor.map(fetch, inst_ids)):
+                print(f"\n{'='*40}\n分析 {inst_id}\n{'='*40}")
+                
+                if ta.data.empty: # type: ignore
+                    print(f"  ✗ {inst_id} 数据获取失败，跳过")
+                    continue
+                
+                result = _analyze_single_asset(ta, inst_id)
+                if result:
+                    results[inst_id] = result
+                    print(f"  ✓ {inst_id} 分析完成")
     else:
         print("错误: 必须提供 data_file 或 inst_ids 之一")
         return {}
@@ -460,8 +955,14 @@ def analyze_all_assets(data_file: Optional[str] = None,
     timestamp = datetime.now().strftime('%Y%m%d_%H%M%S')
     output_file = os.path.join(result_dir, f'technical_analysis_{timestamp}.json')
     
-    with open(output_file, 'w', encoding='utf-8') as f:
-        json.dump(results, f, indent=2, ensure_ascii=False, default=str)
+    # orjson 直接输出 UTF-8 bytes (等价于 ensure_ascii=False)，numpy 标量无需逐个 str()
+    if orjson is not None:
+        with open(output_file, 'wb') as f:
+            f.write(orjson.dumps(results, default=str,
+                                 option=orjson.OPT_INDENT_2 | orjson.OPT_SERIALIZE_NUMPY))
+    else:
+        with open(output_file, 'w', encoding='utf-8') as f:
+            json.dump(results, f, indent=2, ensure_ascii=False, default=str)
     
     print(f"\n结果已保存至: {output_file}")
     return results
@@ -482,37 +983,40 @@ def _analyze_single_asset(ta: 'TechnicalAnalysis', asset: str) -> Optional[Dict]
         return None
     
     indicators = {}
+    close = ta._close
+    n = len(close)
     
-    # 1. 趋势
-    indicators['MA5'] = ta.calculate_ma(5).iloc[-1] if len(ta.data) >= 5 else None # type: ignore
-    indicators['MA20'] = ta.calculate_ma(20).iloc[-1] if len(ta.data) >= 20 else None # type: ignore
+    # 1. 趋势 (标量直接取底层数组末项，不经 pandas 索引器)
+    indicators['MA5'] = ta.calculate_ma(5).to_numpy()[-1] if n >= 5 else None
+    indicators['MA20'] = ta.calculate_ma(20).to_numpy()[-1] if n >= 20 else None
     plus_di, minus_di, adx = ta.calculate_dmi(14)
-    indicators['ADX'] = adx.iloc[-1] if not adx.empty else None
+    indicators['ADX'] = adx.to_numpy()[-1] if not adx.empty else None
     
     # 2. 动量
     rsi = ta.calculate_rsi(14)
-    indicators['RSI'] = rsi.iloc[-1] if not rsi.empty else None
+    indicators['RSI'] = rsi.to_numpy()[-1] if not rsi.empty else None
     dif, dea, hist = ta.calculate_macd()
-    indicators['MACD_DIF'] = dif.iloc[-1] if not dif.empty else None
+    indicators['MACD_DIF'] = dif.to_numpy()[-1] if not dif.empty else None
     
-    # 3. 价格结构
-    high_price = ta.data['high'].max() # type: ignore
-    low_price = ta.data['low'].min() # type: ignore
-    current_price = ta.data['close'].iloc[-1] # type: ignore
+    # 3. 价格结构 (fmax/fmin 跳过 NaN，与 Series.max()/min() 一致；转为 Python float 以保持原输出类型)
+    high_price = float(np.fmax.reduce(ta._high))
+    low_price = float(np.fmin.reduce(ta._low))
+    current_price = close[-1]
     
     indicators['Fib_Levels'] = ta.calculate_fibonacci_retracement(high_price, low_price)
     indicators['Current_Price'] = current_price
-    indicators['Price_Change_%'] = ((current_price - ta.data['close'].iloc[0]) / ta.data['close'].iloc[0] * 100) # type: ignore
+    indicators['Price_Change_%'] = (current_price - close[0]) / close[0] * 100
     
     # 结果打包
+    datetimes = ta.data['datetime'] # type: ignore
     return {
         'asset': asset,
         'indicators': indicators,
         'data_summary': {
-            'total_candles': len(ta.data), # type: ignore
+            'total_candles': n,
             'date_range': {
-                'start': ta.data['datetime'].iloc[0].isoformat() if len(ta.data) > 0 else None, # type: ignore
-                'end': ta.data['datetime'].iloc[-1].isoformat() if len(ta.data) > 0 else None # type: ignore
+                'start': datetimes.iat[0].isoformat() if n > 0 else None,
+                'end': datetimes.iat[-1].isoformat() if n > 0 else None
             }
         }
     }